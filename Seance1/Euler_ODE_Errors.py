@@ -1,5 +1,6 @@
 import numpy as np
 import matplotlib.pyplot as plt
+from ode_engine import linear_solution, linear_sweep, sweep, ensemble, SCHEMES
 
 # Paramètres du problème
 lam = 1.0
@@ -7,15 +8,9 @@ u0 = 1.0
 T = 60.0  # 1 minute = 60 secondes
 
 # ------------------------------------------------------
-# Fonction pour Euler explicite
+# Fonction pour Euler explicite : u_n = (1 - dt*lam)^n u0, sans boucle en n
 def euler_explicit(dt, T, lam, u0):
-    N = int(T/dt)
-    t = np.linspace(0, N*dt, N+1)
-    u = np.zeros(N+1)
-    u[0] = u0
-    for n in range(N):
-        u[n+1] = (1 - dt*lam)*u[n]
-    return t, u
+    return linear_solution(dt, T, lam, u0, "euler")
 
 # Solution exacte
 def u_exact(t, lam=1.0, u0=1.0):
@@ -51,24 +46,10 @@ plt.show()
 # ------------------------------------------------------
 # 2) Étude de convergence : erreur L2 en fonction du pas
 dts = np.logspace(0, -3, 20)   # 20 valeurs de dt de 1 à 0.001
-err_L2 = []
-err_deriv_L2 = []
 
-for dt in dts:
-    t, u_num = euler_explicit(dt, T, lam, u0)
-    u_ex = u_exact(t, lam, u0)
-
-    # Erreur L2 sur la fonction
-    e = u_num - u_ex
-    L2 = np.sqrt(np.sum(e**2) * dt / T)
-    err_L2.append(L2)
-
-    # Approx dérivée numérique par différences finies
-    du_num = np.diff(u_num)/dt
-    du_ex = -lam * u_ex[:-1]
-    e_der = du_num - du_ex
-    L2_der = np.sqrt(np.sum(e_der**2) * dt / T)
-    err_deriv_L2.append(L2_der)
+# Erreurs L2 sur la fonction et sur la dérivée (différences finies avant)
+# pour tous les dt en un seul calcul vectorisé
+err_L2, err_deriv_L2 = linear_sweep(dts, T, lam, u0, "euler")
 
 # ------------------------------------------------------
 # Tracé des erreurs L2
@@ -90,3 +71,73 @@ plt.tight_layout()
 plt.savefig("figure2.png")
 plt.show()
 
+# ------------------------------------------------------
+# 3) Comparaison des schémas : Euler explicite / implicite, Crank-Nicolson, RK4
+# cas linéaire (puissances du facteur d'amplification) et cas non linéaire
+# u' = -lam*u^2, u = u0/(1 + lam*u0*t), tous les dt avancés ensemble
+def f_nl(t, u):
+    return -lam*u**2
+
+def u_exact_nl(t):
+    return u0/(1 + lam*u0*t)
+
+dts_nl = np.logspace(0, -2, 10)
+
+plt.figure(figsize=(12,5))
+for scheme in SCHEMES:
+    e_lin, _ = linear_sweep(dts, T, lam, u0, scheme)
+    e_nl, _ = sweep(f_nl, u_exact_nl, dts_nl, T, u0, scheme,
+                    dfdu=lambda t, u: -2*lam*u)
+    plt.subplot(1,2,1)
+    plt.loglog(dts, e_lin, 'o-', label=scheme)
+    plt.subplot(1,2,2)
+    plt.loglog(dts_nl, e_nl, 'o-', label=scheme)
+
+plt.subplot(1,2,1)
+plt.xlabel("Pas de temps Δt")
+plt.ylabel("Erreur L2 sur u")
+plt.title("u' = -λu")
+plt.legend()
+plt.subplot(1,2,2)
+plt.xlabel("Pas de temps Δt")
+plt.ylabel("Erreur L2 sur u")
+plt.title("u' = -λu²")
+plt.legend()
+
+plt.tight_layout()
+plt.savefig("figure_schemas.png")
+plt.show()
+
+# ------------------------------------------------------
+# 4) Ensemble : incertitude sur lam et u0, tous les membres avancés ensemble
+# (pour de très grands ensembles : path="ensemble.npy" écrit les solutions
+# bloc par bloc sur disque, solutions=False ne garde que les erreurs)
+rng = np.random.default_rng(0)
+M = 10000
+lam_ens = rng.uniform(0.5, 1.5, M)
+u0_ens = rng.normal(1.0, 0.1, M)
+dt = 0.1
+U, N, L2_ens, _ = ensemble(lam_ens, u0_ens, dt, T, "euler")
+t = np.arange(N.max()+1)*dt
+
+plt.figure(figsize=(12,5))
+
+plt.subplot(1,2,1)
+plt.fill_between(t, np.percentile(U, 5, axis=0), np.percentile(U, 95, axis=0),
+                 alpha=0.3, label="5%-95%")
+plt.plot(t, np.mean(U, axis=0), 'k-', label="moyenne")
+plt.xlim(0, 10)
+plt.xlabel("Temps (s)")
+plt.ylabel("u(t)")
+plt.title("Ensemble de %d membres (dt=%gs)" % (M, dt))
+plt.legend()
+
+plt.subplot(1,2,2)
+plt.scatter(lam_ens, L2_ens, s=1)
+plt.xlabel("λ")
+plt.ylabel("Erreur L2 sur u")
+plt.title("Erreur L2 par membre")
+
+plt.tight_layout()
+plt.savefig("figure_ensemble.png")
+plt.show()
@@ -0,0 +1,192 @@
+import numpy as np
+
+# Étude de convergence de schémas à un pas pour u' = f(t,u) :
+# - modèle linéaire u' = -lam*u : u_n = u0*g(z)^n, z = -lam*dt, évalué en
+#   puissances (pas de boucle en n), toute la série de dt en un seul tableau,
+#   ou un ensemble de paramètres (lam, u0, dt) en tableau 2D par blocs ;
+# - second membre quelconque : tous les dt avancent ensemble (un membre par
+#   dt, pas masqués une fois T atteint), erreurs cumulées au fil des pas.
+
+# facteur d'amplification g(z) de chaque schéma pour u' = -lam*u
+AMPLIFICATION = {
+    "euler": lambda z: 1 + z,
+    "implicit_euler": lambda z: 1/(1 - z),
+    "crank_nicolson": lambda z: (1 + z/2)/(1 - z/2),
+    "rk4": lambda z: 1 + z + z**2/2 + z**3/6 + z**4/24,
+}
+
+SCHEMES = tuple(AMPLIFICATION)
+
+
+def _amplification(scheme, z):
+    try:
+        return AMPLIFICATION[scheme](z)
+    except KeyError:
+        raise ValueError("scheme doit être 'euler', 'implicit_euler', 'crank_nicolson' ou 'rk4'.")
+
+
+def linear_solution(dt, T, lam, u0, scheme="euler"):
+    """
+    Solution discrète de u' = -lam*u sur [0, N*dt], N = int(T/dt) :
+    u_n = u0*g(-lam*dt)^n. Retourne (t, u).
+    """
+    N = int(T/dt)
+    t = np.linspace(0, N*dt, N+1)
+    u = u0*_amplification(scheme, -lam*dt)**np.arange(N+1)
+    return t, u
+
+
+def linear_sweep(dts, T, lam, u0, scheme="euler"):
+    """
+    Erreurs L2 (solution et dérivée par différence finie avant) de u' = -lam*u
+    pour tous les pas dts en un seul calcul vectorisé : les N_k+1 instants de
+    chaque pas sont mis bout à bout, les sommes par pas faites par reduceat.
+      L2     = sqrt(sum_{n=0..N} (u_n - u_ex(t_n))^2 * dt/T)
+      L2_der = sqrt(sum_{n=0..N-1} ((u_{n+1}-u_n)/dt + lam*u_ex(t_n))^2 * dt/T)
+    Retourne (L2, L2_der), tableaux de taille len(dts).
+    """
+    dts = np.asarray(dts, dtype=float)
+    N = (T/dts).astype(int)
+    counts = N + 1
+    starts = np.cumsum(counts) - counts
+    k = np.repeat(np.arange(len(dts)), counts)
+    n = np.arange(counts.sum()) - starts[k]
+    g = _amplification(scheme, -lam*dts)
+    u = u0*g[k]**n
+    u_ex = u0*np.exp(-lam*n*dts[k])
+    L2 = np.sqrt(np.add.reduceat((u - u_ex)**2, starts)*dts/T)
+    # dérivée : (u_{n+1}-u_n)/dt sur chaque pas, le dernier instant n'y contribue pas
+    e_der = np.zeros_like(u)
+    e_der[:-1] = (u[1:] - u[:-1])/dts[k[:-1]] + lam*u_ex[:-1]
+    e_der[starts[1:] - 1] = 0.
+    e_der[-1] = 0.
+    L2_der = np.sqrt(np.add.reduceat(e_der**2, starts)*dts/T)
+    return L2, L2_der
+
+
+def ensemble(lam, u0, dt, T, scheme="euler", chunk=None, path=None,
+             solutions=True):
+    """
+    Ensemble de problèmes u' = -lam*u, u(0) = u0 (études d'incertitude) :
+    lam, u0, dt tableaux ou scalaires diffusés à M membres, avancés ensemble
+    en tableau 2D (membres x instants), par blocs de chunk membres (None :
+    blocs d'environ 2^16 valeurs), la mémoire ne dépend donc pas de M.
+
+    Retourne (U, N, L2, L2_der) :
+      U[k, n] = u_n du membre k pour n ≤ N[k] = int(T/dt[k]) (NaN au-delà si
+      les dt diffèrent) ; None si solutions=False ;
+      L2, L2_der : erreurs de chaque membre, définies comme dans linear_sweep.
+    path : fichier .npy où U est écrit bloc par bloc, U est alors relu en
+    memmap ; None = U en mémoire.
+    """
+    lam, u0, dt = np.broadcast_arrays(*(np.atleast_1d(np.asarray(a, dtype=float))
+                                        for a in (lam, u0, dt)))
+    M = len(lam)
+    N = (T/dt).astype(int)
+    ncol = int(N.max()) + 1
+    if chunk is None:
+        chunk = max(1, 2**16 // ncol)
+    U = None
+    if solutions:
+        if path is None:
+            U = np.empty((M, ncol))
+        else:
+            U = np.lib.format.open_memmap(path, mode="w+", dtype=float,
+                                          shape=(M, ncol))
+    L2 = np.empty(M)
+    L2_der = np.empty(M)
+    n = np.arange(ncol)
+    for i0 in range(0, M, chunk):
+        i1 = min(M, i0 + chunk)
+        l, a, h, Nk = (v[i0:i1, None] for v in (lam, u0, dt, N))
+        g = _amplification(scheme, -l*h)
+        # u_n/u0 = g^n par produit cumulé (la récurrence du schéma, ligne par ligne)
+        G = np.empty((i1 - i0, ncol))
+        G[:, :1] = 1.
+        G[:, 1:] = g
+        np.cumprod(G, axis=1, out=G)
+        Q = np.exp(-l*h*n)
+        e = G - Q
+        # (u_{n+1}-u_n)/dt = u_n (g-1)/dt
+        e_der = G[:, :-1]*((g - 1)/h)
+        e_der += l*Q[:, :-1]
+        if Nk.min() < ncol - 1:
+            e[n > Nk] = 0.
+            e_der[n[:-1] >= Nk] = 0.
+            G[n > Nk] = np.nan
+        w = np.abs(a[:, 0])*np.sqrt(h[:, 0]/T)
+        L2[i0:i1] = w*np.sqrt(np.einsum("ij,ij->i", e, e))
+        L2_der[i0:i1] = w*np.sqrt(np.einsum("ij,ij->i", e_der, e_der))
+        if solutions:
+            G *= a
+            U[i0:i1] = G
+    if solutions and path is not None:
+        U.flush()
+        del U
+        U = np.load(path, mmap_mode="r")
+    return U, N, L2, L2_der
+
+
+def _newton(G, dG, v, tol=1e-14, itmax=30):
+    # Newton élément par élément pour G(v) = 0
+    for _ in range(itmax):
+        dv = G(v)/dG(v)
+        v = v - dv
+        if np.all(np.abs(dv) <= tol*(1 + np.abs(v))):
+            break
+    return v
+
+
+def step(f, t, u, dt, scheme, dfdu=None):
+    """
+    Un pas du schéma pour u' = f(t,u), appliqué élément par élément
+    (t, u, dt scalaires ou tableaux de même forme). Pour les schémas
+    implicites, Newton avec dfdu(t,u) (différence finie si None).
+    """
+    if scheme == "euler":
+        return u + dt*f(t, u)
+    if scheme == "rk4":
+        k1 = f(t, u)
+        k2 = f(t + dt/2, u + dt/2*k1)
+        k3 = f(t + dt/2, u + dt/2*k2)
+        k4 = f(t + dt, u + dt*k3)
+        return u + dt/6*(k1 + 2*k2 + 2*k3 + k4)
+    if dfdu is None:
+        def dfdu(t, v):
+            eps = 1e-7*(1 + np.abs(v))
+            return (f(t, v + eps) - f(t, v - eps))/(2*eps)
+    if scheme == "implicit_euler":
+        # v = u + dt f(t+dt, v)
+        return _newton(lambda v: v - u - dt*f(t + dt, v),
+                       lambda v: 1 - dt*dfdu(t + dt, v), u + dt*f(t, u))
+    if scheme == "crank_nicolson":
+        # v = u + dt/2 (f(t,u) + f(t+dt,v))
+        fu = f(t, u)
+        return _newton(lambda v: v - u - dt/2*(fu + f(t + dt, v)),
+                       lambda v: 1 - dt/2*dfdu(t + dt, v), u + dt*fu)
+    raise ValueError("scheme doit être 'euler', 'implicit_euler', 'crank_nicolson' ou 'rk4'.")
+
+
+def sweep(f, u_exact, dts, T, u0, scheme="rk4", dfdu=None):
+    """
+    Même étude que linear_sweep pour un second membre f(t,u) quelconque
+    (vectorisé) et sa solution exacte u_exact(t). Tous les pas dts avancent
+    ensemble ; un membre ne bouge plus après ses N_k = int(T/dt_k) pas.
+    La dérivée exacte est f(t_n, u_ex(t_n)). Retourne (L2, L2_der).
+    """
+    dts = np.asarray(dts, dtype=float)
+    N = (T/dts).astype(int)
+    u = np.full(len(dts), u0, dtype=float)
+    s = np.zeros(len(dts))
+    s_der = np.zeros(len(dts))
+    for n in range(N.max()):
+        active = n < N
+        t = n*dts
+        u_ex = u_exact(t)
+        s += np.where(active, (u - u_ex)**2, 0.)
+        unew = step(f, t, u, dts, scheme, dfdu)
+        e_der = (unew - u)/dts - f(t, u_ex)
+        s_der += np.where(active, e_der**2, 0.)
+        u = np.where(active, unew, u)
+    s += (u - u_exact(N*dts))**2
+    return np.sqrt(s*dts/T), np.sqrt(s_der*dts/T)
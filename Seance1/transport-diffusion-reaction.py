@@ -1,5 +1,6 @@
 import numpy as np
 import matplotlib.pyplot as plt
+from adr2d import ADR2D
 
 # Paramètres
 Lx, Ly = 1.0, 1.0
@@ -12,6 +13,8 @@ X, Y = np.meshgrid(x, y, indexing="ij")
 Tmax = 0.1
 dt = 1e-4
 Nt = int(Tmax/dt)
+imex = False   # True : diffusion + réaction implicites (ADI), pas limité par la CFL d'advection
+threads = 1    # threads pour la mise à jour par blocs de lignes (résultat identique)
 
 # Paramètres physiques
 v1, v2 = 1.0, 0.5
@@ -32,26 +35,14 @@ u = np.zeros((Nx+1, Ny+1))
 def u_exact(t, X, Y):
     return np.exp(-lam*t) * f_source(0, X, Y)
 
-# Boucle en temps
-for n in range(Nt):
-    # gradients
-    u_x = (np.roll(u, -1, axis=0) - np.roll(u, 1, axis=0)) / (2*dx)
-    u_y = (np.roll(u, -1, axis=1) - np.roll(u, 1, axis=1)) / (2*dy)
-
-    # laplacien
-    u_xx = (np.roll(u, -1, axis=0) - 2*u + np.roll(u, 1, axis=0)) / dx**2
-    u_yy = (np.roll(u, -1, axis=1) - 2*u + np.roll(u, 1, axis=1)) / dy**2
-    lap = u_xx + u_yy
-
-    # PDE : Euler explicite
-    rhs = -v1*u_x - v2*u_y + nu*lap - lam*u + f_source(n*dt, X, Y)
-    u = u + dt*rhs
-
-    # Conditions de Dirichlet sur bords entrants
-    u[0,:]  = 0 if v1>0 else u[0,:]
-    u[-1,:] = 0 if v1<0 else u[-1,:]
-    u[:,0]  = 0 if v2>0 else u[:,0]
-    u[:,-1] = 0 if v2<0 else u[:,-1]
+# Boucle en temps : Euler explicite par le moteur ADR2D (tampons préalloués,
+# source stationnaire calculée une fois, Dirichlet sur les bords entrants,
+# gradient nul sur les bords sortants)
+solver = ADR2D(x, y, v1, v2, nu, lam, f_source(0, X, Y), threads=threads)
+if imex:
+    Nt = int(np.ceil(Tmax/solver.stable_dt(imex=True)))
+    dt = Tmax/Nt
+u = solver.run(dt, Nt, imex)
 
 # Comparaison avec une "solution exacte"
 u_ex = u_exact(Tmax, X, Y)
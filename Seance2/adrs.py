@@ -1,6 +1,8 @@
 import math
 import numpy as np
 import matplotlib.pyplot as plt
+from adrs_kernel import adrs_step
+from sweep import mesh_sweep, print_table
 
 #u,t = -V u,x + k u,xx  -lamda u + f
 
@@ -20,14 +22,11 @@ ifre=1000000  #plot every ifre time iterations
 eps=0.001     #relative convergence ratio
 niter_refinement=10      #niter different calculations with variable mesh size
 
-error=np.zeros((niter_refinement))
-
-for iter in range (niter_refinement):
-    NX=NX+3
 
+def solve_mesh(NX):
+    #calcul complet sur un maillage a NX points (sans trace, pour mesh_sweep)
     dx = L/(NX-1)                 #Grid step (space)
     dt = dx**2/(V*dx+K+dx**2)   #Grid step (time)  condition CFL de stabilite 10.4.5
-    print(dx,dt)
 
     ### MAIN PROGRAM ###
 
@@ -37,21 +36,19 @@ for iter in range (niter_refinement):
     F = np.zeros((NX))
     rest = []
     RHS = np.zeros((NX))
+    snapshots = []
 
     Tex = np.zeros((NX)) #np.sin(2*np.pi*x)
     Texx = np.zeros((NX)) #np.sin(2*np.pi*x)
     for j in range (1,NX-1):
         Tex[j] = np.sin(2*j*math.pi/NX)
     for j in range (1,NX-1):
-        Texx[j]=(Tex[j+1]-Tex[j-1])/(2*dx)  #np.cos(j*math.pi/NX)*math.pi/NX  
+        Texx[j]=(Tex[j+1]-Tex[j-1])/(2*dx)  #np.cos(j*math.pi/NX)*math.pi/NX
         Txx=(Tex[j+1]-2*Tex[j]+Tex[j-1])/(dx**2)  #-np.sin(j*math.pi/NX)*(math.pi/NX)**2    #
         F[j]=V*Texx[j]-K*Txx+lamda*Tex[j]
-        
-        
-    dt = dx**2/(V*dx+2*K+abs(np.max(F))*dx**2)   #Grid step (time)  condition CFL de stabilite 10.4.5
 
-    plt.figure(1)
 
+    dt = dx**2/(V*dx+2*K+abs(np.max(F))*dx**2)   #Grid step (time)  condition CFL de stabilite 10.4.5
 
     # Main loop en temps
     #for n in range(0,NT):
@@ -61,48 +58,51 @@ for iter in range (niter_refinement):
     while(n<NT and res/res0>eps):
         n+=1
     #discretization of the advection/diffusion/reaction/source equation
-        res=0
-        for j in range (1, NX-1):
-            xnu=K+0.5*dx*abs(V) 
-            Tx=(T[j+1]-T[j-1])/(2*dx)
-            Txx=(T[j-1]-2*T[j]+T[j+1])/(dx**2)
-            RHS[j] = dt*(-V*Tx+xnu*Txx-lamda*T[j]+F[j])
-            res+=abs(RHS[j])
-
-        for j in range (1, NX-1):
-            T[j] += RHS[j]
-            RHS[j]=0
+        xnu=K+0.5*dx*abs(V)
+        res=adrs_step(T,F,dx,dt,V,xnu,lamda,RHS)
 
 
         if (n == 1 ):
             res0=res
 
         rest.append(res)
-    #Plot every ifre time steps
+    #Plot every ifre time steps (snapshots traces apres le balayage)
         if (n%ifre == 0 or (res/res0)<eps):
-            print(n,res)
-            plotlabel = "t = %1.2f" %(n * dt)
-            plt.plot(x,T, label=plotlabel,color = plt.get_cmap('copper')(float(n)/NT))
-          
-
-    print(n,res)
-    plt.plot(x,T)
-
-    # plt.xlabel(u'$x$', fontsize=26)
-    # plt.ylabel(u'$T$', fontsize=26, rotation=0)
-    # plt.title(u'ADRS 1D')
-    # plt.legend()
-
-    plt.figure(2)
-    plt.plot(np.log10(rest/rest[0]))
+            snapshots.append((n, T.copy()))
 
     err=np.dot(T-Tex,T-Tex)
     errh1=0
     for j in range (1,NX-1):
         errh1+=(Texx[j]-(T[j+1]-T[j-1])/(2*dx))**2
-       
-    error[iter]=np.sqrt(err)
-    print('norm error=',error[iter])
+
+    return dict(N=NX, h=dx, errL2=np.sqrt(err), errH1=np.sqrt(errh1), steps=n,
+                dt=dt, res=res, x=x, T=T, rest=rest, snapshots=snapshots)
+
+
+if __name__ == "__main__":
+    NX_tab=[NX+3*(iter+1) for iter in range(niter_refinement)]
+    table,outputs=mesh_sweep(solve_mesh,NX_tab)
+    print_table(table)
+    error=table["errL2"]
+
+    for out in outputs:
+        print(out["h"],out["dt"])
+        print(out["steps"],out["res"])
+        print('norm error=',out["errL2"])
+
+        plt.figure(1)
+        for n,Tn in out["snapshots"]:
+            plotlabel = "t = %1.2f" %(n * out["dt"])
+            plt.plot(out["x"],Tn, label=plotlabel,color = plt.get_cmap('copper')(float(n)/NT))
+        plt.plot(out["x"],out["T"])
+
+        # plt.xlabel(u'$x$', fontsize=26)
+        # plt.ylabel(u'$T$', fontsize=26, rotation=0)
+        # plt.title(u'ADRS 1D')
+        # plt.legend()
+
+        plt.figure(2)
+        plt.plot(np.log10(out["rest"]/out["rest"][0]))
 
 
 # plt.figure(3)
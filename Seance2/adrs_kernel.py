@@ -0,0 +1,60 @@
+import numpy as np
+
+#u,t = -V u,x + k u,xx  -lamda u + f
+#noyau explicite partagé par adrs.py et Seance6/optim_adrs.py
+
+
+def adrs_residual(T, F, dx, dt, V, xnu, lamda, out=None, work=None):
+    """
+    Incrément explicite RHS = dt*(-V T_x + xnu T_xx - lamda T + F) aux nœuds
+    intérieurs (dérivées centrées, maillage uniforme), calculé par tranches.
+
+    T, F : tableaux (..., NX) ; la dernière dimension est l'espace, ce qui
+           permet d'avancer plusieurs solutions à la fois.
+    out  : tableau de sortie optionnel (même forme que T), réutilisé d'un pas
+           à l'autre. Les nœuds de bord de out ne sont pas modifiés.
+    work : tampon optionnel de la forme de T[..., 1:-1] ; avec out et work,
+           aucun tableau n'est alloué (ufuncs out=, mêmes opérations dans le
+           même ordre, résultat identique).
+
+    Retourne (RHS, res) avec res = somme des |RHS| intérieurs (par ligne).
+    Les itérés sont ceux de la boucle "for j in range(1, NX-1)" d'origine :
+    même expression, évaluée sur T au pas n pour tous les nœuds.
+    """
+    if out is None:
+        out = np.zeros_like(T, dtype=float)
+    Tm = T[..., :-2]
+    Tc = T[..., 1:-1]
+    Tp = T[..., 2:]
+    if work is None:
+        Tx = (Tp-Tm)/(2*dx)
+        Txx = (Tm-2*Tc+Tp)/(dx**2)
+        out[..., 1:-1] = dt*(-V*Tx+xnu*Txx-lamda*Tc+F[..., 1:-1])
+        res = np.sum(np.abs(out[..., 1:-1]), axis=-1)
+        return out, res
+    o = out[..., 1:-1]
+    np.subtract(Tp, Tm, out=o)
+    o /= 2*dx
+    o *= -V
+    np.multiply(Tc, 2, out=work)
+    np.subtract(Tm, work, out=work)
+    work += Tp
+    work /= dx**2
+    work *= xnu
+    o += work
+    np.multiply(Tc, lamda, out=work)
+    o -= work
+    o += F[..., 1:-1]
+    o *= dt
+    np.abs(o, out=work)
+    return out, np.sum(work, axis=-1)
+
+
+def adrs_step(T, F, dx, dt, V, xnu, lamda, out=None):
+    """
+    Un pas d'Euler explicite en place : T[1:-1] += RHS[1:-1].
+    Retourne le résidu res (somme des |RHS|) du pas.
+    """
+    out, res = adrs_residual(T, F, dx, dt, V, xnu, lamda, out)
+    T[..., 1:-1] += out[..., 1:-1]
+    return res
@@ -1,5 +1,8 @@
+from functools import partial
 import numpy as np
 import matplotlib.pyplot as plt
+from scipy.linalg import solve_banded
+from sweep import mesh_sweep, print_table
 
 # -------------------------
 # Paramètres physiques
@@ -80,11 +83,105 @@ def cfl_dt(h, safety=0.9):
     denom = abs(v)/h + 2.0*nu/(h*h) + lam
     return safety/denom
 
+# -------------------------
+# Opérateur stationnaire discret (tridiagonal)
+# Lignes intérieures : -v u_s + nu u_ss - lam u = -f  (même upwind que
+# upwind_first_derivative), ligne 0 : Dirichlet, ligne N-1 : Neumann
+# (u_{N-1} - u_{N-2} = 0), comme apply_bc.
+# Stockage bande pour solve_banded : ab[0]=sur-diag, ab[1]=diag, ab[2]=sous-diag
+# -------------------------
+def build_steady_system(N, h, f, u_l):
+    ab = np.zeros((3, N))
+    b = -f.copy()
+    cd = nu/(h*h)
+    ab[0, 2:]   = cd                  # coefficient de u_{i+1} (lignes 1..N-2)
+    ab[1, 1:-1] = -2.0*cd - lam
+    ab[2, :-2]  = cd                  # coefficient de u_{i-1} (lignes 1..N-2)
+    if v >= 0:
+        ab[1, 1:-1] -= v/h
+        ab[2, :-2]  += v/h
+    else:
+        ab[1, 1:-1] += v/h
+        ab[0, 2:]   -= v/h
+    # Dirichlet gauche
+    ab[1, 0] = 1.0
+    ab[0, 1] = 0.0
+    b[0] = u_l
+    # Neumann homogène à droite
+    ab[1, -1] = 1.0
+    ab[2, -2] = -1.0
+    b[-1] = 0.0
+    return ab, b
+
+# -------------------------
+# Multigrille géométrique (FAS, V-cycle)
+# Problème stationnaire écrit L(u) = g :
+#   intérieur : L(u) = v u_s - nu u_ss + lam u , g = f
+#   ligne 0   : L(u) = u_0           , g = u_l   (Dirichlet)
+#   ligne N-1 : L(u) = u_{N-1}-u_{N-2}, g = 0    (Neumann)
+# Lisseur = le pas d'Euler explicite ci-dessus (dt = cfl_dt(h, 0.5) amortit
+# les modes oscillants) ; niveaux grossiers emboîtés h -> 2h tant que N-1 est
+# pair ; résolution directe (solve_banded) sur le niveau le plus grossier
+# (N <= n_coarse).
+# gamma=1 : V-cycle, gamma=2 : W-cycle (défaut). La CL de Neumann d'ordre 1
+# (u_{N-1}=u_{N-2}) place le bord effectif en L-h/2, différent à chaque
+# niveau : le taux du V-cycle se dégrade avec le nombre de niveaux, celui du
+# W-cycle reste ~0.35 quel que soit N.
+# -------------------------
+def steady_operator(u, h):
+    Lu = v*upwind_first_derivative(u, h, v) - nu*laplacian_central(u, h) + lam*u
+    Lu[0] = u[0]
+    Lu[-1] = u[-1] - u[-2]
+    return Lu
+
+def smooth(u, g, h, nsmooth, safety=0.5):
+    dt = cfl_dt(h, safety=safety)
+    for _ in range(nsmooth):
+        rhs = g - steady_operator(u, h)
+        u[1:-1] += dt*rhs[1:-1]
+        u[0] = g[0]                   # Dirichlet gauche
+        u[-1] = u[-2] + g[-1]         # Neumann à droite
+    return u
+
+def restrict_full_weighting(r):
+    rc = r[::2].copy()
+    rc[1:-1] = 0.25*r[1:-3:2] + 0.5*r[2:-2:2] + 0.25*r[3:-1:2]
+    return rc
+
+def prolong_linear(ec):
+    e = np.zeros(2*(len(ec)-1)+1)
+    e[::2] = ec
+    e[1::2] = 0.5*(ec[:-1] + ec[1:])
+    return e
+
+def mg_cycle(u, g, h, gamma=2, nu1=2, nu2=2, n_coarse=33):
+    N = len(u)
+    if (N-1) % 2 or N <= n_coarse:
+        # niveau le plus grossier : résolution directe
+        ab, b = build_steady_system(N, h, g, g[0])
+        b[-1] = g[-1]
+        return solve_banded((1, 1), ab, b)
+    smooth(u, g, h, nu1)
+    for _ in range(gamma):
+        # correction FAS : L_2h(u_2h) = L_2h(R u) + R(g - L_h(u))
+        r = g - steady_operator(u, h)
+        uc = u[::2].copy()
+        gc = steady_operator(uc, 2*h) + restrict_full_weighting(r)
+        uc_new = mg_cycle(uc.copy(), gc, 2*h, gamma, nu1, nu2, n_coarse)
+        u += prolong_linear(uc_new - uc)
+    smooth(u, g, h, nu2)
+    return u
+
 # -------------------------
 # Marche en temps vers stationnaire
 # On intègre: u_t = -v u_s + nu u_ss - lam u + f
+# method="explicit" : Euler explicite (CFL) jusqu'à res/res0 < tol
+# method="direct"   : résolution directe du système tridiagonal en O(N)
+#                     (même point fixe discret, sert de recoupement)
+# method="multigrid": cycles FAS jusqu'à res/res0 < tol (N-1 pair, idéalement
+#                     N = 2^k+1) ; une "itération" de res_hist = un cycle
 # -------------------------
-def solve_stationary(N, tol=1e-6, itmax=2_000_000, report=False):
+def solve_stationary(N, tol=1e-6, itmax=2_000_000, report=False, method="explicit"):
     s, h = build_grid(N)
     u = np.zeros(N)
     f = f_source(s)
@@ -109,6 +206,40 @@ def solve_stationary(N, tol=1e-6, itmax=2_000_000, report=False):
     res = res0
     res_hist.append(res/res0)
 
+    if method == "direct":
+        ab, b = build_steady_system(N, h, f, u_l)
+        u = solve_banded((1, 1), ab, b)
+        du  = upwind_first_derivative(u, h, v)
+        lap = laplacian_central(u, h)
+        rhs = -v*du + nu*lap - lam*u + f
+        rhs[0] = rhs[-1] = 0.0        # lignes remplacées par les CL
+        res = np.sqrt(h*np.sum(rhs**2))
+        res_hist.append(res/res0)
+        if report:
+            print(f"N={N}, direct, res/res0={res/res0:.3e}, h={h:.3e}")
+        return s, u, res_hist, h
+    elif method == "multigrid":
+        if (N-1) % 2:
+            raise ValueError("multigrid : N-1 doit être pair (maillages emboîtés).")
+        g = f.copy()
+        g[0], g[-1] = u_l, 0.0
+        # résidu intérieur (les lignes de CL sont vérifiées après chaque lissage)
+        res0 = l2_norm((g - steady_operator(u, h))[1:-1], h)
+        if res0 == 0: res0 = 1.0
+        res = res0
+        res_hist = [1.0]
+        n = 0
+        while n < itmax and (res/res0) > tol:
+            n += 1
+            u = mg_cycle(u, g, h)
+            res = l2_norm((g - steady_operator(u, h))[1:-1], h)
+            res_hist.append(res/res0)
+        if report:
+            print(f"N={N}, multigrid, cycles={n}, res/res0={res/res0:.3e}, h={h:.3e}")
+        return s, u, res_hist, h
+    elif method != "explicit":
+        raise ValueError("method doit être 'explicit', 'direct' ou 'multigrid'.")
+
     n=0
     while n < itmax and (res/res0) > tol:
         n += 1
@@ -150,60 +281,79 @@ def h1_seminorm(u, uex, h):
     return l2_norm(du - duex, h)
 
 # -------------------------
-# (A) Une exécution avec N=100 + figures demandées
+# Un maillage de l'étude de convergence (pour mesh_sweep)
 # -------------------------
-N = 100
-s, u, res_hist, h = solve_stationary(N, tol=1e-8, report=True)
-uex = u_exact(s)
+def convergence_case(N, method="direct"):
+    s, u, res_hist, h = solve_stationary(N, tol=1e-8, method=method)
+    uex = u_exact(s)
+    return dict(N=N, h=h, errL2=l2_norm(u - uex, h), errH1=h1_seminorm(u, uex, h),
+                steps=len(res_hist)-1, s=s, u=u)
 
-# Figures: solution, convergence, (u-uex)
-plt.figure(figsize=(15,4))
+if __name__ == "__main__":
+    # -------------------------
+    # (A) Une exécution avec N=100 + figures demandées
+    # -------------------------
+    N = 100
+    s, u, res_hist, h = solve_stationary(N, tol=1e-8, report=True)
+    uex = u_exact(s)
 
-plt.subplot(1,3,1)
-plt.plot(s, uex, '-', label='u_exact')
-plt.plot(s, u , '--', label='u_h')
-plt.xlabel('s'); plt.ylabel('u'); plt.title('Solution')
-plt.legend(); plt.grid(True)
+    # Recoupement : marche en temps vs résolution directe (même point fixe discret)
+    _, u_dir, _, _ = solve_stationary(N, method="direct", report=True)
+    print(f"max|u_explicit - u_direct| = {np.max(np.abs(u - u_dir)):.3e}")
 
-plt.subplot(1,3,2)
-it = np.arange(len(res_hist))
-plt.semilogy(it, res_hist, '-')
-plt.xlabel('itération'); plt.ylabel('||R||/||R0||')
-plt.title('Convergence vers le stationnaire'); plt.grid(True)
+    # Figures: solution, convergence, (u-uex)
+    plt.figure(figsize=(15,4))
 
-plt.subplot(1,3,3)
-plt.plot(s, u-uex, '-')
-plt.xlabel('s'); plt.ylabel('u_h - u_exact')
-plt.title('Erreur ponctuelle'); plt.grid(True)
+    plt.subplot(1,3,1)
+    plt.plot(s, uex, '-', label='u_exact')
+    plt.plot(s, u , '--', label='u_h')
+    plt.xlabel('s'); plt.ylabel('u'); plt.title('Solution')
+    plt.legend(); plt.grid(True)
 
-plt.tight_layout()
-plt.show()
+    plt.subplot(1,3,2)
+    it = np.arange(len(res_hist))
+    plt.semilogy(it, res_hist, '-')
+    plt.xlabel('itération'); plt.ylabel('||R||/||R0||')
+    plt.title('Convergence vers le stationnaire'); plt.grid(True)
 
-# -------------------------
-# (B) Étude de convergence sur 5 maillages
-# N = 3, 6, 12, 24, 48  (par ex.)
-# -------------------------
-Ns = [3, 6, 12, 24, 48]
-hs, errL2, errH1 = [], [], []
-for Ntest in Ns:
-    s, u, res_hist, h = solve_stationary(Ntest, tol=1e-8)
-    uex = u_exact(s)
-    hs.append(h)
-    errL2.append(l2_norm(u - uex, h))
-    errH1.append(h1_seminorm(u, uex, h))
+    plt.subplot(1,3,3)
+    plt.plot(s, u-uex, '-')
+    plt.xlabel('s'); plt.ylabel('u_h - u_exact')
+    plt.title('Erreur ponctuelle'); plt.grid(True)
+
+    plt.tight_layout()
+    plt.show()
+
+    # -------------------------
+    # (B) Étude de convergence sur 5 maillages
+    # N = 3, 6, 12, 24, 48  (par ex.)
+    # Résolution directe : un solveur tridiagonal par maillage
+    # -------------------------
+    Ns = [3, 6, 12, 24, 48]
+    table, outputs = mesh_sweep(convergence_case, Ns)
+    print_table(table)
+    hs, errL2, errH1 = table["h"], table["errL2"], table["errH1"]
+
+    # Tracé erreurs vs h
+    plt.figure(figsize=(12,4))
 
-# Tracé erreurs vs h
-plt.figure(figsize=(12,4))
+    plt.subplot(1,2,1)
+    plt.loglog(hs, errL2, 'o-')
+    plt.xlabel('h'); plt.ylabel('||u_h - u_exact||_{L2}')
+    plt.title('Erreur L2 vs h'); plt.grid(True, which='both')
 
-plt.subplot(1,2,1)
-plt.loglog(hs, errL2, 'o-')
-plt.xlabel('h'); plt.ylabel('||u_h - u_exact||_{L2}')
-plt.title('Erreur L2 vs h'); plt.grid(True, which='both')
+    plt.subplot(1,2,2)
+    plt.loglog(hs, errH1, 'o-')
+    plt.xlabel('h'); plt.ylabel('||u_h - u_exact||_{H1-semi}')
+    plt.title('Erreur H1(semi) vs h'); plt.grid(True, which='both')
 
-plt.subplot(1,2,2)
-plt.loglog(hs, errH1, 'o-')
-plt.xlabel('h'); plt.ylabel('||u_h - u_exact||_{H1-semi}')
-plt.title('Erreur H1(semi) vs h'); plt.grid(True, which='both')
+    plt.tight_layout()
+    plt.show()
 
-plt.tight_layout()
-plt.show()
+    # -------------------------
+    # (C) Multigrille : nombre de cycles en fonction de N (maillages 2^k+1)
+    # -------------------------
+    Ns_mg = [65, 129, 257, 513, 1025, 2049]
+    table_mg, _ = mesh_sweep(partial(convergence_case, method="multigrid"), Ns_mg)
+    print("multigrille (steps = nombre de cycles) :")
+    print_table(table_mg)
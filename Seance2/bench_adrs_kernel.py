@@ -0,0 +1,88 @@
+import math
+import time
+import numpy as np
+import matplotlib.pyplot as plt
+from adrs_kernel import adrs_step
+
+#benchmark : boucle scalaire d'origine vs noyau par tranches (adrs_kernel)
+#même problème que adrs.py : u,t = -V u,x + k u,xx  -lamda u + f
+
+# PHYSICAL PARAMETERS
+K = 0.1     #Diffusion coefficient
+L = 1.0     #Domain size
+V=1
+lamda=1
+
+# NUMERICAL PARAMETERS
+NX_tab=[10, 30, 100, 300, 1000, 3000, 10000]
+nsteps=200   #nombre de pas chronométrés par maillage
+
+
+def setup(NX):
+    dx = L/(NX-1)
+    F = np.zeros((NX))
+    Tex = np.zeros((NX))
+    for j in range (1,NX-1):
+        Tex[j] = np.sin(2*j*math.pi/NX)
+    for j in range (1,NX-1):
+        Texx=(Tex[j+1]-Tex[j-1])/(2*dx)
+        Txx=(Tex[j+1]-2*Tex[j]+Tex[j-1])/(dx**2)
+        F[j]=V*Texx-K*Txx+lamda*Tex[j]
+    dt = dx**2/(V*dx+2*K+abs(np.max(F))*dx**2)
+    return dx, dt, F
+
+
+def step_loop(T, F, dx, dt, RHS):
+    #boucle d'origine (adrs.py avant vectorisation)
+    NX=len(T)
+    res=0
+    for j in range (1, NX-1):
+        xnu=K+0.5*dx*abs(V)
+        Tx=(T[j+1]-T[j-1])/(2*dx)
+        Txx=(T[j-1]-2*T[j]+T[j+1])/(dx**2)
+        RHS[j] = dt*(-V*Tx+xnu*Txx-lamda*T[j]+F[j])
+        res+=abs(RHS[j])
+    for j in range (1, NX-1):
+        T[j] += RHS[j]
+        RHS[j]=0
+    return res
+
+
+rate_loop=[]
+rate_slice=[]
+for NX in NX_tab:
+    dx, dt, F = setup(NX)
+    xnu=K+0.5*dx*abs(V)
+
+    T1 = np.zeros((NX))
+    RHS1 = np.zeros((NX))
+    nloop = max(2, min(nsteps, 200000//NX))   #on limite le temps de la boucle scalaire
+    t0=time.perf_counter()
+    for n in range(nloop):
+        res1=step_loop(T1, F, dx, dt, RHS1)
+    rate_loop.append(nloop/(time.perf_counter()-t0))
+
+    T2 = np.zeros((NX))
+    RHS2 = np.zeros((NX))
+    for n in range(nloop):
+        res2=adrs_step(T2, F, dx, dt, V, xnu, lamda, RHS2)
+
+    T3 = np.zeros((NX))
+    t0=time.perf_counter()
+    for n in range(nsteps):
+        adrs_step(T3, F, dx, dt, V, xnu, lamda, RHS2)
+    rate_slice.append(nsteps/(time.perf_counter()-t0))
+
+    #mêmes itérés à l'arrondi près
+    ecart=np.max(np.abs(T1-T2))/max(np.max(np.abs(T1)),1.e-30)
+    print("NX=%6d  boucle: %10.1f pas/s   tranches: %10.1f pas/s   x%6.1f   ecart rel.=%.1e  res=%.3e/%.3e"
+          % (NX, rate_loop[-1], rate_slice[-1], rate_slice[-1]/rate_loop[-1], ecart, res1, res2))
+
+plt.loglog(NX_tab, rate_loop, 'o-', label="boucle for j")
+plt.loglog(NX_tab, rate_slice, 's-', label="adrs_kernel (tranches)")
+plt.xlabel("NX")
+plt.ylabel("pas / seconde")
+plt.title("ADRS 1D : pas de temps explicites par seconde")
+plt.grid(True, which='both')
+plt.legend()
+plt.show()
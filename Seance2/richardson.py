@@ -0,0 +1,88 @@
+import numpy as np
+
+#extrapolation de Richardson sur une suite de résultats A(h) :
+#A(h) = A + C h^p + o(h^p)
+
+#écart relatif entre deux résultats en dessous duquel la suite est
+#considérée comme convergée (différences au niveau des erreurs d'arrondi)
+ROUNDOFF = 100*np.finfo(float).eps
+
+
+def richardson_step(A_coarse, A_fine, r, p):
+    #élimine le terme h^p entre A(r h) et A(h)
+    return A_fine + (A_fine - A_coarse)/(r**p - 1.)
+
+
+def converged(A):
+    #deux derniers résultats égaux aux erreurs d'arrondi près
+    return abs(A[-2] - A[-1]) <= ROUNDOFF*max(abs(A[-2]), abs(A[-1]))
+
+
+def observed_order(h, A):
+    """
+    Ordre observé p à partir des trois derniers résultats (h décroissants) :
+    (A0-A1)/(A1-A2) = (h0^p-h1^p)/(h1^p-h2^p), formule explicite
+    log(q)/log(r) si le rapport r = h0/h1 = h1/h2 est constant, sinon
+    résolution par dichotomie sur p dans [0.05, 20].
+    """
+    h0, h1, h2 = (float(v) for v in h[-3:])
+    A0, A1, A2 = A[-3:]
+    if converged(A):
+        raise ValueError("suite déjà convergée : pas d'ordre observé.")
+    q = (A0 - A1)/(A1 - A2)
+    if q <= 0:
+        raise ValueError("suite non monotone : pas d'ordre observé.")
+    r1, r2 = h0/h1, h1/h2
+    if abs(r1 - r2) <= 1e-12*r1:
+        return np.log(q)/np.log(r1)
+
+    def g(p):
+        return (h0**p - h1**p)/(h1**p - h2**p) - q
+    lo, hi = 0.05, 20.
+    if g(lo)*g(hi) > 0:
+        raise ValueError("ordre observé hors de [0.05, 20].")
+    for _ in range(100):
+        mid = 0.5*(lo + hi)
+        if g(lo)*g(mid) <= 0:
+            hi = mid
+        else:
+            lo = mid
+    return 0.5*(lo + hi)
+
+
+def richardson(h, A, p=None):
+    """
+    Extrapolation de Richardson des résultats A[k] obtenus aux pas h[k]
+    (h décroissants, au moins 2 valeurs ; 3 si p n'est pas donné).
+
+    p : ordre de l'erreur ; None = ordre observé sur les trois derniers.
+    Retourne (A_ext, p, err) : valeur extrapolée à partir des deux derniers
+    résultats, ordre utilisé, et estimation d'erreur |A_ext - A_ext'| où A_ext'
+    est la même extrapolation sans le dernier résultat (|A_ext - A[-1]|, plus
+    pessimiste, si les résultats ne suffisent pas).
+    Si p n'est pas donné et que les deux derniers résultats ne diffèrent que
+    par les erreurs d'arrondi (cf. converged), l'ordre n'est pas estimé :
+    retourne (A[-1], nan, 0.).
+    """
+    h = np.asarray(h, dtype=float)
+    A = np.asarray(A, dtype=float)
+    nmin = 2 if p is not None else 3
+    if len(A) < nmin:
+        raise ValueError("pas assez de résultats pour l'extrapolation de Richardson.")
+    if p is None and converged(A):
+        return A[-1], np.nan, 0.
+    A_ext, p_used = _extrapolate(h, A, p)
+    if len(A) > nmin:
+        if p is None and converged(A[:-1]):
+            err = abs(A_ext - A[-2])
+        else:
+            err = abs(A_ext - _extrapolate(h[:-1], A[:-1], p)[0])
+    else:
+        err = abs(A_ext - A[-1])
+    return A_ext, p_used, err
+
+
+def _extrapolate(h, A, p):
+    if p is None:
+        p = observed_order(h, A)
+    return richardson_step(A[-2], A[-1], h[-2]/h[-1], p), p
@@ -0,0 +1,61 @@
+import os
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+#balayage de maillages indépendants en parallele (un processus par maillage)
+
+_fields = ("N", "h", "errL2", "errH1", "steps", "wall")
+
+
+def _timed(solve, N):
+    t0 = time.perf_counter()
+    out = solve(N)
+    out["wall"] = time.perf_counter() - t0
+    out.setdefault("N", N)
+    return out
+
+
+def mesh_sweep(solve, sizes, max_workers=None):
+    """
+    Lance solve(N) pour chaque N de sizes dans un pool de processus.
+
+    solve : fonction de niveau module (picklable) qui résout un maillage et
+            renvoie un dict contenant au moins 'h', 'errL2', 'errH1', 'steps' ;
+            les autres clés (solution, historique de résidu...) sont conservées
+            pour le tracé, qui se fait après le balayage.
+    max_workers : nombre de processus (None = nombre de cœurs, 1 = en série
+                  dans le processus courant).
+
+    Retourne (table, outputs) : table est un tableau structuré
+    (N, h, errL2, errH1, steps, wall) dans l'ordre de sizes, outputs la liste
+    des dicts renvoyés par solve (même ordre).
+    """
+    sizes = list(sizes)
+    if max_workers is None:
+        max_workers = min(len(sizes), os.cpu_count() or 1)
+    # plus gros maillages soumis en premier : le temps total ~ le plus gros cas
+    order = sorted(range(len(sizes)), key=lambda i: -sizes[i])
+    outputs = [None]*len(sizes)
+    if max_workers <= 1:
+        for i in order:
+            outputs[i] = _timed(solve, sizes[i])
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            futures = {i: pool.submit(_timed, solve, sizes[i]) for i in order}
+            for i, fut in futures.items():
+                outputs[i] = fut.result()
+
+    table = np.zeros(len(sizes), dtype=[("N", int), ("h", float), ("errL2", float),
+                                         ("errH1", float), ("steps", int), ("wall", float)])
+    for i, out in enumerate(outputs):
+        for name in _fields:
+            table[name][i] = out[name]
+    return table, outputs
+
+
+def print_table(table):
+    print(f"{'N':>7} {'h':>11} {'errL2':>11} {'errH1':>11} {'steps':>9} {'wall(s)':>9}")
+    for r in table:
+        print(f"{r['N']:7d} {r['h']:11.4e} {r['errL2']:11.4e} {r['errH1']:11.4e} "
+              f"{r['steps']:9d} {r['wall']:9.3f}")
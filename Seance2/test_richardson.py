@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from richardson import observed_order, richardson
+
+
+def test_ordre_observe_et_extrapolation():
+    h = np.array([0.1, 0.05, 0.025, 0.0125])
+    A_ext, p, err = richardson(h, 1. + 3.*h**2 + h**3)
+    assert p == pytest.approx(2., abs=0.1)
+    assert A_ext == pytest.approx(1., abs=1e-5)
+    assert err < 1e-3
+
+
+def test_suite_convergee():
+    with np.errstate(all="raise"):
+        A_ext, p, err = richardson([.1, .05, .025], [2., 2., 2.])
+    assert A_ext == 2.
+    assert np.isnan(p)
+    assert err == 0.
+    with pytest.raises(ValueError):
+        observed_order([.1, .05, .025], [2., 2., 2.])
+
+
+def test_suite_convergee_passe_erreur():
+    A_ext, p, err = richardson([.2, .1, .05, .025], [1.5, 2., 2., 2.])
+    assert (A_ext, err) == (2., 0.)
+
+
+def test_suite_bruitee():
+    #sommes du point milieu de 3x+1 sur [0,1], N=25..200 : exactes, seul
+    #l'arrondi varie (signes alternés des différences)
+    h = [1/25, 1/50, 1/100, 1/200]
+    A = [2.4999999999999996, 2.5, 2.5000000000000004, 2.5]
+    A_ext, p, err = richardson(h, A)
+    assert A_ext == 2.5
+    assert err == 0.
@@ -1,24 +1,53 @@
 import numpy as np
 
+def second_derivative(x, u):
+    """
+    f'' aux nœuds d'un maillage x (trié, non uniforme) par différences finies
+    à trois points ; aux bords on copie la valeur intérieure.
+    """
+    h0 = x[1:-1] - x[:-2]
+    h1 = x[2:] - x[1:-1]
+    fpp = np.zeros_like(u)
+    fpp[1:-1] = 2.0*((u[2:] - u[1:-1])/h1 - (u[1:-1] - u[:-2])/h0)/(h0 + h1)
+    fpp[0] = fpp[1]
+    fpp[-1] = fpp[-2]
+    return fpp
+
+
+def metric_nodes(x, metric):
+    """
+    Nœuds équirépartis pour la longueur métrique s(x) = int sqrt(metric) dx :
+    s est cumulée (trapèzes) sur les points x où la métrique est connue, puis
+    inversée par interpolation aux niveaux 0, 1, ..., n  =>  h_loc ~ 1/sqrt(metric).
+    """
+    d = np.sqrt(metric)
+    s = np.concatenate(([0.0], np.cumsum(0.5*(d[1:] + d[:-1])*np.diff(x))))
+    n = max(1, int(np.ceil(s[-1])))
+    return np.interp(np.linspace(0.0, s[-1], n + 1), s, x)
+
+
 def lebesgue_adapt(fct, fct_xx, L, R, itermax_lebesgue=10, tol=1e-3):
     """
     Intégration 'façon Lebesgue' avec pas local h(x) piloté par une métrique issue de f''(x).
-    On rafraîchit la grille adaptative et on compare l'intégrale obtenue à la première passe.
+    Chaque passe calcule f'' sur la grille de pas hmin complétée par les
+    nœuds courants, la métrique
+    min(max(|f''|/epsilon, 1/hmax^2), 1/hmin^2), puis le maillage adapté par
+    inversion de la longueur métrique cumulée, et intègre f par trapèzes sur
+    ce maillage. La passe suivante repart des nœuds adaptés (point fixe,
+    même pb qu'avec une EDP quand f'' n'est pas donnée).
 
     Paramètres
     ----------
     fct : callable
-        f(x)
-    fct_xx : callable
-        f''(x) (donnée ici ; pas de point-fixe car dérivée seconde fournie)
-        # pas de point-fixe car dérivée seconde donnée, comment se passer de fct_xx,
-        # même pb qu'avec une EDP (note de la version d'origine)
+        f(x), appelée sur des tableaux
+    fct_xx : callable ou None
+        f''(x) ; si None, f'' est estimée par différences finies sur les nœuds
     L, R : float
         Bords du domaine d'intégration
     itermax_lebesgue : int
-        Nombre max de passes (pour tester la stabilité de l'intégrale)
+        Nombre max de passes
     tol : float
-        Seuil d'arrêt sur l'écart |IL[0] - IL[n]| (< tol)
+        Seuil d'arrêt sur l'écart entre deux passes successives |IL[n] - IL[n-1]| (< tol)
 
     Retour
     ------
@@ -32,62 +61,41 @@ def lebesgue_adapt(fct, fct_xx, L, R, itermax_lebesgue=10, tol=1e-3):
     # bornes de pas local
     hmin = (R - L) / 100.0
     hmax = (R - L) / 3.0
-    epsilon0 = 0.01  # valeur initiale indicative (non utilisée ensuite)
+    epsilon = 0.9
 
     nptL = np.zeros(itermax_lebesgue, dtype=int)
     eps  = np.zeros(itermax_lebesgue)
     IL   = np.zeros(itermax_lebesgue)
-    
-    fpp = np.zeros_like(u)
-    fpp[1:-1] = (u[2:] - 2.0*u[1:-1] + u[:-2]) / (h*h)
-    # bords : on copie la valeur intérieure (ou on peut mettre des schémas décentrés d'ordre 1)
-    fpp[0]  = fpp[1]
-    fpp[-1] = fpp[-2]
+
+    # grille grossière de pas hmin : la métrique est toujours échantillonnée
+    # au moins sur cette grille, plus les nœuds adaptés de la passe précédente
+    grid = np.linspace(L, R, int(round((R - L)/hmin)) + 1)
+    x = grid
 
     for npt in range(itermax_lebesgue):
-        # dans le code d'origine, epsilon est remis à 0.9 à chaque passe
-        epsilon = 0.9
+        x = np.union1d(grid, x)
+        u = fct(x)
+        uxx = fct_xx(x) if fct_xx is not None else second_derivative(x, u)
 
-        x = L
+        # métrique basée sur f'' :
+        # metric = min( max(|f''|/epsilon, 1/hmax^2), 1/hmin^2 )
+        metric = np.minimum(np.maximum(np.abs(uxx)/epsilon, 1.0/hmax**2), 1.0/hmin**2)
+
+        # nouveaux nœuds : h_loc ~ sqrt(1/metric)
+        x = metric_nodes(x, metric)
         u = fct(x)
 
-        while x < R:
-            #uxx = fct_xx(x)
-            fpp = np.zeros_like(u)
-            fpp[1:-1] = (u[2:] - 2.0*u[1:-1] + u[:-2]) / (h*h)
-            # bords : on copie la valeur intérieure (ou on peut mettre des schémas décentrés d'ordre 1)
-            fpp[0]  = fpp[1]
-            fpp[-1] = fpp[-2]
-            
-            uxx = fpp
-
-            # métrique basée sur f'' :
-            # metric = min( max(|f''|/epsilon, 1/hmax^2), 1/hmin^2 )
-            metric = min(max(abs(uxx) / epsilon, 1.0 / (hmax**2)), 1.0 / (hmin**2))
-
-            # pas local : h_loc = min( sqrt(1/metric), R - x )
-            hloc = min(np.sqrt(1.0 / metric), R - x)
-            # print(hloc**2 * metric)  # debug comme dans l'original
-
-            u0 = u
-            x  = x + hloc
-            u  = fct(x)
-
-            # intégration locale (trapèze)
-            IL[npt] += hloc * (u + u0) / 2.0
-            nptL[npt] += 1
-            eps[npt] = epsilon
-
-        # contrôle de stabilité par rapport à la première passe
-        if npt > 0:
-            error = abs(IL[0] - IL[npt])
-            if error < tol:
-                print("Approximate Lebesgues integral  epsilon, npt, error:",
-                      epsilon, nptL[npt], error)
-                break
+        # intégration (trapèzes) sur le maillage adapté
+        IL[npt] = np.sum(np.diff(x)*(u[1:] + u[:-1]))/2.0
+        nptL[npt] = len(x) - 1
+        eps[npt] = epsilon
 
+        # contrôle de stabilité par rapport à la passe précédente
+        error = abs(IL[npt] - IL[npt-1]) if npt > 0 else np.nan
         print("Approximate Lebesgues integral  epsilon, npt, error:",
-              epsilon, nptL[npt], (abs(IL[0] - IL[npt]) if npt > 0 else np.nan))
+              epsilon, nptL[npt], error)
+        if npt > 0 and error < tol:
+            break
 
     return IL[:npt+1], nptL[:npt+1], eps[:npt+1]
 
@@ -114,4 +122,9 @@ if __name__ == "__main__":
     print("nptL (par passe):", nptL)
     print("eps (par passe) :", eps)
 
+    # sans f'' : différences finies sur les nœuds de chaque passe
+    IL, nptL, eps = lebesgue_adapt(fct, None, L, R, itermax_lebesgue=10, tol=1e-3)
+    print("IL (f'' par DF) :", IL)
+    print("nptL (f'' par DF):", nptL)
+
     
@@ -1,29 +1,59 @@
 import numpy as np
 
-def integrale_lebesgue(f, L, R, N, n_points_y=40000):
+
+def _level_counts(y, N, y_min, y_max):
+    # Nombre de points de chaque "tranche" { x | y_i ≤ f(x) < y_{i+1} } en un
+    # seul passage : np.histogram a les mêmes bords (linspace) et les mêmes
+    # comparaisons y_i ≤ y < y_{i+1}, sauf la dernière tranche fermée à droite
+    # dont on retire les points où y = y_max (exclus dans la définition)
+    counts, _ = np.histogram(y, bins=N, range=(y_min, y_max))
+    counts[-1] -= np.count_nonzero(y == y_max)
+    return counts
+
+
+def _samples(L, R, n, chunk):
+    # points de np.linspace(L, R, n), produits par blocs de taille chunk
+    step = (R - L) / (n - 1)
+    for i0 in range(0, n, chunk):
+        i1 = min(n, i0 + chunk)
+        x = np.arange(i0, i1) * step + L
+        if i1 == n:
+            x[-1] = R
+        yield x
+
+
+def integrale_lebesgue(f, L, R, N, n_points_y=40000, chunk=None):
     """
     Approximation numérique de l'intégrale de Lebesgue de f sur [L, R].
     N : nombre de niveaux pour discrétiser l'image de f (en y).
     n_points_y : nombre de points pour estimer les mesures (grille en x).
+    chunk : None (toutes les valeurs f(x) en mémoire) ou taille des blocs :
+            f est évaluée bloc par bloc en deux passages (bornes de l'image,
+            puis comptage par niveau) ; la mémoire ne dépend plus de n_points_y.
+            Les comptes sont entiers, le résultat est le même qu'en un bloc.
     """
 
     # Évaluer f sur un grand nombre de points pour estimer les mesures
     # Plus ce nombre est grand, meilleure est l'approximation
-    x = np.linspace(L, R, n_points_y)
-    y = f(x)
+    if chunk is None:
+        x = np.linspace(L, R, n_points_y)
+        y = f(x)
+        y_min, y_max = np.min(y), np.max(y)
+        counts = _level_counts(y, N, y_min, y_max)
+    else:
+        chunk = max(1, int(chunk))
+        y_min, y_max = np.inf, -np.inf
+        for x in _samples(L, R, n_points_y, chunk):
+            y = f(x)
+            y_min, y_max = min(y_min, np.min(y)), max(y_max, np.max(y))
+        counts = np.zeros(N, dtype=np.int64)
+        for x in _samples(L, R, n_points_y, chunk):
+            counts += _level_counts(f(x), N, y_min, y_max)
 
     # Niveaux de discrétisation de l'image
-    y_min, y_max = np.min(y), np.max(y)
     levels = np.linspace(y_min, y_max, N + 1)   # N+1 niveaux (y0, y1, ..., yN)
 
-    # Calculer la mesure de chaque "tranche" { x | y_i ≤ f(x) < y_{i+1} }
-    integral = 0.0
+    # Mesure de Lebesgue = longueur ≈ (#points) * Δx
     longueur_cellule = (R - L) / (n_points_y - 1)   # maille en x
-    for i in range(N):
-        mask = (y >= levels[i]) & (y < levels[i+1])
-        # Mesure de Lebesgue = longueur ≈ (#points) * Δx
-        measure = np.sum(mask) * longueur_cellule
-        # Contribution ≈ (valeur représentative de la tranche) * mesure
-        integral += levels[i] * measure
-
-    return integral
+    # Contribution ≈ (valeur représentative de la tranche) * mesure
+    return np.dot(levels[:-1], counts) * longueur_cellule
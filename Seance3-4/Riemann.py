@@ -1,31 +1,153 @@
+import heapq
+import math
 import numpy as np
 import matplotlib.pyplot as plt
 
-def integrale_riemann(f, a, b, N, method="midpoint"):
+import seances
+seances.use("Seance2")
+from richardson import richardson, richardson_step
+
+def _blocks(n, chunk):
+    # découpage [0, n) en blocs [i0, i1) de taille chunk (un seul bloc si chunk=None)
+    chunk = n if chunk is None else max(1, int(chunk))
+    for i0 in range(0, n, chunk):
+        yield i0, min(n, i0 + chunk)
+
+
+def integrale_riemann(f, a, b, N, method="midpoint", chunk=None, return_samples=False):
     """
     Intégrale de Riemann de f sur [a,b] avec N sous-intervalles (pas uniforme en x).
     method ∈ {"left", "right", "midpoint", "trapz"}.
+
+    chunk : None (tous les points d'un coup) ou taille des blocs : f est évaluée
+            bloc par bloc, la mémoire ne dépend plus de N. Somme par bloc
+            (np.sum, par paires) puis cumul compensé (Kahan-Neumaier) entre blocs.
+    return_samples : si True, le tableau des points d'échantillonnage est
+                     construit (taille N ou N+1) et renvoyé ; sinon x vaut None.
+    Retourne (I, x, dx).
     """
     if N <= 0:
         raise ValueError("N doit être > 0.")
+    if method not in ("left", "right", "midpoint", "trapz"):
+        raise ValueError("method doit être 'left', 'right', 'midpoint' ou 'trapz'.")
     dx = (b - a) / N
 
     if method == "left":
-        x = a + dx * np.arange(0, N)          # points à gauche
-        return np.sum(f(x)) * dx, x, dx
+        n, offset = N, 0.0          # points à gauche
     elif method == "right":
-        x = a + dx * np.arange(1, N+1)        # points à droite
-        return np.sum(f(x)) * dx, x, dx
+        n, offset = N, 1.0          # points à droite
     elif method == "midpoint":
-        x = a + dx * (np.arange(0, N) + 0.5)  # milieux
-        return np.sum(f(x)) * dx, x, dx
-    elif method == "trapz":
-        # règle des trapèzes (N sous-intervalles => N+1 points)
-        x = np.linspace(a, b, N+1)
-        fx = f(x)
-        return np.trapz(fx, x), x, dx
+        n, offset = N, 0.5          # milieux
     else:
-        raise ValueError("method doit être 'left', 'right', 'midpoint' ou 'trapz'.")
+        n, offset = N + 1, 0.0      # trapèzes : N sous-intervalles => N+1 points
+
+    total, comp = 0.0, 0.0
+    for i0, i1 in _blocks(n, chunk):
+        fx = f(a + dx * (np.arange(i0, i1) + offset))
+        part = np.sum(fx)
+        if method == "trapz":
+            # poids 1/2 aux deux extrémités
+            if i0 == 0:
+                part -= 0.5 * fx[0]
+            if i1 == n:
+                part -= 0.5 * fx[-1]
+        # cumul compensé (Neumaier)
+        t = total + part
+        if abs(total) >= abs(part):
+            comp += (total - t) + part
+        else:
+            comp += (part - t) + total
+        total = t
+
+    x = a + dx * (np.arange(0, n) + offset) if return_samples else None
+    return (total + comp) * dx, x, dx
+
+# Gauss-Kronrod 7-15 sur [-1,1] (nœuds et poids de QUADPACK)
+_xk = np.array([0.991455371120812639206854697526329, 0.949107912342758524526189684047851,
+                0.864864423359769072789712788640926, 0.741531185599394439863864773280788,
+                0.586087235467691130294144845693013, 0.405845151377397166906606412076961,
+                0.207784955007898467600689403773245, 0.0])
+_wk = np.array([0.022935322010529224963732008058970, 0.063092092629978553290700663189204,
+                0.104790010322250183839876322541518, 0.140653259715525918745189590510238,
+                0.169004726639267902826583426598550, 0.190350578064785409913256402421014,
+                0.204432940075298892414161999234649, 0.209482141084727828012999174891714])
+_wg = np.array([0.129484966168869693270611432679082, 0.279705391489276667901467771423780,
+                0.381830050505118944950369775488975, 0.417959183673469387755102040816327])
+_GK_NODES = np.concatenate((-_xk[:-1], _xk[::-1]))
+_GK_WK = np.concatenate((_wk[:-1], _wk[::-1]))
+_GK_WG = np.zeros(15)
+_GK_WG[1:7:2] = _wg[:-1]            # nœuds de Gauss : _xk[1], _xk[3], _xk[5]
+_GK_WG[7] = _wg[-1]                 # et 0
+_GK_WG[9::2] = _wg[-2::-1]
+
+
+def _gk15(f, lo, hi):
+    # règles G7 et K15 sur les intervalles [lo_k, hi_k], en un seul appel à f
+    c = 0.5 * (lo + hi)
+    h = 0.5 * (hi - lo)
+    fx = f((c[:, None] + h[:, None] * _GK_NODES).ravel()).reshape(len(lo), 15)
+    K = h * (fx @ _GK_WK)
+    G = h * (fx @ _GK_WG)
+    return K, np.abs(K - G)
+
+
+def integrale_adaptative(f, a, b, tol=1e-10, batch=32, max_eval=10**6):
+    """
+    Intégrale adaptative de f sur [a,b] (Gauss-Kronrod 7-15).
+    Les intervalles sont rangés dans une file de priorité selon leur erreur
+    estimée |K15 - G7| ; à chaque étape les `batch` pires sont coupés en deux
+    et f est évaluée sur tous les nouveaux nœuds en un seul appel (f doit
+    accepter un tableau).
+    Arrêt quand l'erreur totale estimée est < tol ou après max_eval évaluations.
+    Retourne (I, erreur estimée, nombre d'évaluations de f).
+    """
+    K, E = _gk15(f, np.array([float(a)]), np.array([float(b)]))
+    neval = 15
+    heap = [(-E[0], 0, float(a), float(b), K[0])]
+    count = 1
+    err = E[0]
+    while err > tol and neval < max_eval:
+        worst = [heapq.heappop(heap) for _ in range(min(batch, len(heap)))]
+        lo = np.array([w[2] for w in worst])
+        hi = np.array([w[3] for w in worst])
+        mid = 0.5 * (lo + hi)
+        K, E = _gk15(f, np.concatenate((lo, mid)), np.concatenate((mid, hi)))
+        neval += 15 * len(K)
+        for k, (l, r) in enumerate(zip(np.concatenate((lo, mid)), np.concatenate((mid, hi)))):
+            heapq.heappush(heap, (-E[k], count, l, r, K[k]))
+            count += 1
+        err = -sum(w[0] for w in heap)
+    I = math.fsum(w[4] for w in heap)
+    return I, err, neval
+
+def integrale_romberg(f, a, b, tol=1e-10, N0=1, max_levels=25):
+    """
+    Méthode de Romberg : trapèzes à N0, 2N0, 4N0... sous-intervalles (chaque
+    niveau ne calcule f qu'aux nouveaux milieux, en un appel), puis
+    extrapolations de Richardson successives d'ordres 2, 4, 6...
+    Arrêt quand deux diagonales successives du tableau diffèrent de moins de tol.
+    Retourne (I, erreur estimée, nombre d'évaluations de f).
+    """
+    N = N0
+    fx = f(np.linspace(a, b, N + 1))
+    T = (np.sum(fx) - 0.5 * (fx[0] + fx[-1])) * (b - a) / N
+    neval = N + 1
+    row = [T]
+    err = np.inf
+    for _ in range(max_levels):
+        h = (b - a) / N
+        mid = f(a + h * (np.arange(N) + 0.5))
+        neval += N
+        N *= 2
+        T = 0.5 * T + 0.5 * h * np.sum(mid)
+        new = [T]
+        for j, prev in enumerate(row):
+            new.append(richardson_step(prev, new[-1], 2., 2 * (j + 1)))
+        err = abs(new[-1] - row[-1])
+        row = new
+        if err < tol:
+            break
+    return row[-1], err, neval
 
 # ------------------ Exemple d'utilisation ------------------
 if __name__ == "__main__":
@@ -41,9 +163,21 @@ if __name__ == "__main__":
     N = 200          # nb de sous-intervalles
     method = "midpoint"  # "left" | "right" | "midpoint" | "trapz"
 
-    I, xsamp, dx = integrale_riemann(f_ex, A, B, N=N, method=method)
+    I, xsamp, dx = integrale_riemann(f_ex, A, B, N=N, method=method, return_samples=True)
     print(f"Intégrale ({method}, N={N}) ≈ {I:.6f}")
 
+    # quadrature adaptative : précision cible sans choisir N
+    Ia, erra, neval = integrale_adaptative(f_ex, A, B, tol=1e-10)
+    print(f"Intégrale (Gauss-Kronrod adaptatif) ≈ {Ia:.12f}, erreur estimée {erra:.1e}, {neval} évaluations de f")
+    Ir, errr, neval = integrale_romberg(f_ex, A, B, tol=1e-10)
+    print(f"Intégrale (Romberg) ≈ {Ir:.12f}, erreur estimée {errr:.1e}, {neval} évaluations de f")
+
+    # Richardson sur des résultats grossiers : ordre observé et valeur extrapolée
+    Ns = [N // 8, N // 4, N // 2, N]
+    Is = [integrale_riemann(f_ex, A, B, n, method=method)[0] for n in Ns]
+    Iext, p, errx = richardson([(B - A) / n for n in Ns], Is)
+    print(f"Richardson ({method}, N={Ns}) : ordre observé {p:.3f}, I ≈ {Iext:.12f}, erreur estimée {errx:.1e}")
+
     # ----- TRACÉ -----
     xplot = np.linspace(A, B, 2000)
     yplot = f_ex(xplot)
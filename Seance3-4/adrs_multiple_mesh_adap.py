@@ -2,6 +2,9 @@ import math
 import numpy as np
 import matplotlib.pyplot as plt
 import sys
+from remesh import remesh_from_hloc
+from transfer import transfer
+from nonuniform_ops import NonUniformOperators
 
 def adrs_fct(n, x):
 #u,t = -V u,x + k u,xx  -lamda u + f
@@ -41,6 +44,8 @@ NX = 3    #Number of grid points : initialization
 NT = 10000   #Number of time steps max
 ifre=1000000  #plot every ifre time iterations
 eps=0.001     #relative convergence ratio
+local_dt=False   #local time stepping : each node uses its own stable dt (pseudo-time to steady state only)
+transfer_method="linear"   #transfert de T apres remaillage et vers le maillage de fond : linear, cubic, l2
 
 errorL2=np.zeros((niter_refinement))
 errorH1=np.zeros((niter_refinement))
@@ -51,6 +56,9 @@ NX_background=200
 background_mesh=np.arange(NX_background)*(xmax-xmin)*0.005
 Tbacknew=[]        
 
+x = np.linspace(xmin,xmax,NX)
+T = np.zeros((NX))
+
 itera=0
 NX0=0
 while( np.abs(NX0-NX) > 2 and itera<niter_refinement-1):
@@ -59,36 +67,19 @@ while( np.abs(NX0-NX) > 2 and itera<niter_refinement-1):
     itertab[itera]=1./NX
 
     iplot=itera-2
-    
-    x = np.linspace(xmin,xmax,NX)
-    T = np.zeros((NX))
 
 #mesh adaptation using local metric
     if(itera>0):
-        xnew=[]
-        Tnew=[]
-        nnew=1
-        xnew.append(xmin)
-        Tnew.append(T[0])
-        while(xnew[nnew-1] < xmax-hmin):
-            for i in range(0,NX-1):
-                if(xnew[nnew-1] >= x[i] and xnew[nnew-1] <= x[i+1] and xnew[nnew-1]<xmax-hmin):
-                    hll=(hloc[i]*(x[i+1]-xnew[nnew-1])+hloc[i+1]*(xnew[nnew-1]-x[i]))/(x[i+1]-x[i])
-                    hll=min(max(hmin,hll),hmax)
-                    nnew+=1
-#                    print(nnew,hll,min(xmax,xnew[nnew-2]+hll))
-                    xnew.append(min(xmax,xnew[nnew-2]+hll))                
-#solution interpolation for initialization (attention initial solution on first mesh in the row)
-                    un=(T[i]*(x[i+1]-xnew[nnew-1])+T[i+1]*(xnew[nnew-1]-x[i]))/(x[i+1]-x[i])
-                    Tnew.append(un)
+#new nodes from hloc (defined on the previous mesh) + transfer of the previous solution for initialization
+        xnew,_=remesh_from_hloc(x,hloc,T,xmin,xmax,hmin,hmax)
+        T=transfer(x,T,xnew,transfer_method)
+        T[0]=0
+        T[-1]=T[-2]
+        nnew=len(xnew)
                     
         NX0=NX
         NX=nnew
-        x = np.zeros((NX))
-        x[0:NX]=xnew[0:NX]
-        T = np.zeros((NX))
-        T[0:NX]=Tnew[0:NX]
-#        T[NX-1]=0
+        x = xnew
     
     rest = []
     F = np.zeros((NX))
@@ -96,18 +87,17 @@ while( np.abs(NX0-NX) > 2 and itera<niter_refinement-1):
     hloc = np.ones((NX))*hmax*0.5
     metric = np.ones((NX))
 
+    #geometric coefficients computed once per mesh
+    ops=NonUniformOperators(x)
+    xnu=ops.viscosity(K,V)
+
     Tex = np.zeros((NX))
-    for j in range (1,NX-1):
-        Tex[j] = 2*np.exp(-100*(x[j]-(xmax+xmin)*0.25)**2)+np.exp(-200*(x[j]-(xmax+xmin)*0.65)**2)
+    Tex[1:-1] = 2*np.exp(-100*(x[1:-1]-(xmax+xmin)*0.25)**2)+np.exp(-200*(x[1:-1]-(xmax+xmin)*0.65)**2)
         
-    dt=1.e30
-    for j in range (1,NX-1):
-        Tx=(Tex[j+1]-Tex[j-1])/(x[j+1]-x[j-1])
-        Txip1=(Tex[j+1]-Tex[j])/(x[j+1]-x[j])
-        Txim1=(Tex[j]-Tex[j-1])/(x[j]-x[j-1])
-        Txx=(Txip1-Txim1)/(0.5*(x[j+1]+x[j])-0.5*(x[j]+x[j-1]))
-        F[j]=V*Tx-K*Txx+lamda*Tex[j]
-        dt=min(dt,0.5*(x[j+1]-x[j-1])**2/(V*np.abs(x[j+1]-x[j-1])+4*K+np.abs(F[j])*(x[j+1]-x[j-1])**2))
+    F[1:-1]=V*ops.gradient(Tex)-K*ops.laplacian(Tex)+lamda*Tex[1:-1]
+    dt_loc=ops.stable_dt(V,K,F)
+    dt=np.min(dt_loc)
+    dt_step=dt_loc if local_dt else dt
 
     print('NX=',NX,'Dt=',dt)        
 
@@ -118,44 +108,30 @@ while( np.abs(NX0-NX) > 2 and itera<niter_refinement-1):
     #time step loop
     n=0
     res=1
-    res0=1
+    #residu d'un depart a T=0 : meme critere d'arret avec ou sans transfert
+    res0=np.sum(np.abs(dt_step*F[1:-1]))
     t=0
     while(n<NT and res/res0>eps and t<Time):
         n+=1
         t+=dt
     #discretization of the advection/diffusion/reaction/source equation
-        res=0
-        for j in range (1, NX-1):
-            visnum=0.5*(0.5*(x[j+1]+x[j])-0.5*(x[j]+x[j-1]))*np.abs(V)
-            xnu=K+visnum            
-            Tx=(T[j+1]-T[j-1])/(x[j+1]-x[j-1])
-            Txip1=(T[j+1]-T[j])/(x[j+1]-x[j])
-            Txim1=(T[j]-T[j-1])/(x[j]-x[j-1])
-            Txx=(Txip1-Txim1)/(0.5*(x[j+1]+x[j])-0.5*(x[j]+x[j-1]))            
-            RHS[j] = dt*(-V*Tx+xnu*Txx-lamda*T[j]+F[j])
-            metric[j]=min(1./hmin**2,max(1./hmax**2,abs(Txx)/err))
-            res+=abs(RHS[j])
+        RHS,res,Txx=ops.residual(T,F,dt_step,V,xnu,lamda,RHS)
+        metric[1:-1]=ops.metric(Txx,hmin,hmax,err)
 
         metric[0]=metric[1]
         
         metric[NX-1]=metric[NX-2]    #ux a droite = 0
         #metric[NX-1]=2*metric[NX-2]-metric[NX-3]   #uxx a droite =0
 
-        for j in range (0, NX-1):
-            metric[j]=0.5*(metric[j]+metric[j+1])
+        metric[0:NX-1]=0.5*(metric[0:NX-1]+metric[1:NX])
         metric[NX-1]=metric[NX-2]
         
         hloc[0:NX]=np.sqrt(1./metric[0:NX])
 
-        for j in range (1, NX-1):
-            T[j] += RHS[j]
-            RHS[j]=0
+        T[1:NX-1] += RHS[1:NX-1]
         
         T[NX-1]=T[NX-2] #1.2*T[NX-2]-0.2*T[NX-3]
 
-        if (n == 1 ):
-            res0=res
-
         rest.append(res)
     #Plot every ifre time steps
         if (n%ifre == 0 or (res/res0)<eps):
@@ -168,15 +144,7 @@ while( np.abs(NX0-NX) > 2 and itera<niter_refinement-1):
     Tbackold=Tbacknew.copy()
 
 #solution interpolation to background mesh    
-    Tbacknew=[]        
-    #Tbacknew.append(T[0])        
-    for i in range(NX_background):
-        for inew in range(nnew-1):
-            if(background_mesh[i] >= xnew[inew] and background_mesh[i] <= xnew[inew+1]):
-                un=(T[inew+1]*(background_mesh[i]-xnew[inew])+T[inew]*(xnew[inew+1]-background_mesh[i]))/(xnew[inew+1]-xnew[inew])
-                Tbacknew.append(un)
-
-    Tbacknew=np.array(Tbacknew)
+    Tbacknew=transfer(x,T,background_mesh,transfer_method)
 
     if(len(Tbacknew)==len(Tbackold)):
         cauchy=np.sum(np.abs(Tbacknew-Tbackold))
@@ -199,13 +167,8 @@ while( np.abs(NX0-NX) > 2 and itera<niter_refinement-1):
 
 
 #    errL2=np.sqrt(np.dot(T-Tex,T-Tex))
-    errH1h=0
-    errL2h=0
-    for j in range (1, NX-1):
-        Texx=(Tex[j+1]-Tex[j-1])/(x[j+1]-x[j-1])
-        Tx=(T[j+1]-T[j-1])/(x[j+1]-x[j-1])
-        errL2h+=(0.5*(x[j+1]+x[j])-0.5*(x[j]+x[j-1]))*(T[j]-Tex[j])**2
-        errH1h+=(0.5*(x[j+1]+x[j])-0.5*(x[j]+x[j-1]))*(Tx-Texx)**2
+    errL2h=np.sum(ops.cell*(T[1:-1]-Tex[1:-1])**2)
+    errH1h=np.sum(ops.cell*(ops.gradient(T)-ops.gradient(Tex))**2)
 
     errorL2[itera]=errL2h
     errorH1[itera]=errL2h+errH1h
@@ -0,0 +1,113 @@
+import numpy as np
+
+#opérateurs différences finies sur maillage 1D non uniforme,
+#coefficients géométriques calculés une fois par maillage
+
+
+class NonUniformOperators:
+    """
+    Opérateurs aux nœuds intérieurs j=1..NX-2 d'un maillage x (trié) :
+      gradient  : (T[j+1]-T[j-1])/(x[j+1]-x[j-1])
+      laplacien : ((T[j+1]-T[j])/(x[j+1]-x[j]) - (T[j]-T[j-1])/(x[j]-x[j-1])) / cell[j]
+    avec la mesure de cellule cell[j] = 0.5*(x[j+1]+x[j]) - 0.5*(x[j]+x[j-1]).
+    Les expressions sont celles des boucles des scripts adaptatifs ; les
+    tableaux renvoyés sont de taille NX-2.
+    """
+    def __init__(self, x):
+        x = np.asarray(x, dtype=float)
+        self.x = x
+        self.NX = len(x)
+        self.dxc = x[2:]-x[:-2]
+        self.dxp = x[2:]-x[1:-1]
+        self.dxm = x[1:-1]-x[:-2]
+        self.cell = 0.5*(x[2:]+x[1:-1])-0.5*(x[1:-1]+x[:-2])
+
+    def gradient(self, T, out=None):
+        if out is None:
+            return (T[2:]-T[:-2])/self.dxc
+        np.subtract(T[2:], T[:-2], out=out)
+        out /= self.dxc
+        return out
+
+    def laplacian(self, T, out=None, work=None):
+        #out, work : tampons optionnels de taille NX-2 (aucune allocation)
+        if out is None:
+            Txip1 = (T[2:]-T[1:-1])/self.dxp
+            Txim1 = (T[1:-1]-T[:-2])/self.dxm
+            return (Txip1-Txim1)/self.cell
+        np.subtract(T[2:], T[1:-1], out=out)
+        out /= self.dxp
+        np.subtract(T[1:-1], T[:-2], out=work)
+        work /= self.dxm
+        out -= work
+        out /= self.cell
+        return out
+
+    def viscosity(self, K, V, coef=0.5):
+        #K + viscosité numérique coef*cell*|V| (décentrage de l'advection)
+        return K+coef*self.cell*np.abs(V)
+
+    def metric(self, Txx, hmin, hmax, err):
+        #min(1/hmin^2, max(1/hmax^2, |Txx|/err))
+        return np.minimum(1./hmin**2, np.maximum(1./hmax**2, np.abs(Txx)/err))
+
+    def stable_dt(self, V, K, F, coef=0.5):
+        #pas local coef*dxc^2/(V*|dxc| + 4K + |F| dxc^2) aux nœuds intérieurs
+        return coef*self.dxc**2/(V*np.abs(self.dxc)+4*K+np.abs(F[1:-1])*self.dxc**2)
+
+    def residual(self, T, src, dt, V, xnu, lamda, out=None, work=None):
+        """
+        RHS = dt*(-V T_x + xnu T_xx - lamda T + src) aux nœuds intérieurs.
+        xnu : scalaire ou tableau (NX-2) (cf. viscosity). dt peut être un
+        scalaire ou un tableau (NX-2) de pas locaux.
+        work : tampon optionnel (2, NX-2) ; avec out et work, aucun tableau
+        n'est alloué (Txx est alors work[0], valable jusqu'à l'appel suivant).
+        Retourne (RHS, res, Txx) avec res = somme des |RHS| ; Txx sert au
+        calcul de la métrique.
+        """
+        if out is None:
+            out = np.zeros(self.NX)
+        if work is None:
+            Txx = self.laplacian(T)
+            out[1:-1] = dt*(-V*self.gradient(T)+xnu*Txx-lamda*T[1:-1]+src[1:-1])
+            res = np.sum(np.abs(out[1:-1]))
+            return out, res, Txx
+        Txx, w = work
+        self.laplacian(T, Txx, w)
+        o = self.gradient(T, out[1:-1])
+        o *= -V
+        np.multiply(Txx, xnu, out=w)
+        o += w
+        np.multiply(T[1:-1], lamda, out=w)
+        o -= w
+        o += src[1:-1]
+        o *= dt
+        np.abs(o, out=w)
+        return out, np.sum(w), Txx
+
+
+class MetricAccumulator:
+    """
+    Métrique accumulée en flux sur une fenêtre en temps (n nœuds) :
+      'mean' : moyenne pondérée par les pas, sum(dt*m)/sum(dt)
+      'max'  : maximum nœud par nœud
+    Seules la somme (ou le max) et la durée sont conservées.
+    """
+    def __init__(self, n, mode="mean"):
+        if mode not in ("mean", "max"):
+            raise ValueError("mode doit être 'mean' ou 'max'.")
+        self.mode = mode
+        self.m = np.zeros(n)
+        self.time = 0.
+
+    def add(self, m, dt):
+        if self.mode == "mean":
+            self.m += dt*m
+        else:
+            np.maximum(self.m, m, out=self.m)
+        self.time += dt
+
+    def value(self):
+        if self.mode == "mean":
+            return self.m/self.time
+        return self.m.copy()
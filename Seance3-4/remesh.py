@@ -0,0 +1,37 @@
+import numpy as np
+
+#remaillage 1D piloté par hloc, en un seul parcours des maillages (au lieu
+#d'un balayage de tous les intervalles de l'ancien maillage pour chaque
+#nouveau nœud) ; le transfert de solution est dans transfer.py
+
+
+def remesh_from_hloc(x, hloc, T, xmin, xmax, hmin, hmax):
+    """
+    Nouveau maillage xnew à partir du pas local hloc défini aux nœuds de x :
+    x_{k+1} = min(xmax, x_k + clip(hloc(x_k), hmin, hmax)) tant que
+    x_k < xmax-hmin, hloc(x_k) interpolé linéairement sur l'ancien maillage.
+    Tnew : T interpolé au nouveau nœud avec l'intervalle ayant servi à hloc
+    (comme la boucle d'origine, y compris l'extrapolation éventuelle).
+
+    Mêmes nœuds que la double boucle while/for des scripts adaptatifs ;
+    l'ancien maillage est parcouru une seule fois : O(N_new + N_old).
+    """
+    xnew = [xmin]
+    Tnew = [T[0]]
+    i = 0
+    p = xmin
+    last = len(x)-2
+    while p < xmax-hmin:
+        hll = (hloc[i]*(x[i+1]-p)+hloc[i+1]*(p-x[i]))/(x[i+1]-x[i])
+        hll = min(max(hmin, hll), hmax)
+        p = min(xmax, p+hll)
+        xnew.append(p)
+        Tnew.append((T[i]*(x[i+1]-p)+T[i+1]*(p-x[i]))/(x[i+1]-x[i]))
+        # intervalle suivant : un nœud tombant exactement sur x[i+1] est
+        # traité avec l'intervalle i+1, sinon premier intervalle qui le contient
+        if p == x[i+1] and i < last:
+            i += 1
+        else:
+            while i < last and x[i+1] < p:
+                i += 1
+    return np.array(xnew), np.array(Tnew)
@@ -0,0 +1,14 @@
+import os
+import sys
+
+#accès aux modules des autres séances : les dossiers ("Seance2", "Seance3-4",
+#...) ne sont pas des paquets importables, leur chemin relatif à la racine du
+#dépôt est ajouté à sys.path (une seule fois)
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def use(*names):
+    for name in names:
+        path = os.path.join(ROOT, name)
+        if path not in sys.path:
+            sys.path.insert(0, path)
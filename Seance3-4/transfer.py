@@ -0,0 +1,124 @@
+import numpy as np
+from scipy.linalg import solve_banded
+
+#transfert d'une solution P1 entre deux maillages 1D triés quelconques
+#(initialisation après remaillage, comparaison sur le maillage de fond) :
+#les nœuds sont localisés par une fusion des deux maillages, sans boucle
+#sur les intervalles
+
+
+def _merge(x_old, x_new):
+    #fusion de deux maillages triés : le tri stable (timsort) de la
+    #concaténation détecte les deux suites croissantes et les fusionne en un
+    #seul parcours, O(N_old+N_new) ; à égalité, les nœuds de x_old d'abord
+    c = np.concatenate((x_old, x_new))
+    order = np.argsort(c, kind='stable')
+    return c[order], order
+
+
+def _locate(x_old, x_new):
+    #intervalle [x_old[k], x_old[k+1]] contenant chaque x_new (x_new trié,
+    #borné aux extrémités) : nombre de nœuds de x_old fusionnés avant lui, moins 1
+    n = len(x_old)
+    order = _merge(x_old, x_new)[1]
+    k = np.cumsum(order < n)[order >= n]-1
+    return np.clip(k, 0, n-2)
+
+
+def transfer_linear(x_old, u_old, x_new):
+    """
+    Interpolation P1 de u_old (nœuds x_old) aux nœuds x_new ; extrapolation
+    linéaire par le premier / dernier intervalle hors de [x_old[0], x_old[-1]].
+    """
+    x_old = np.asarray(x_old)
+    k = _locate(x_old, x_new)
+    s = (x_new-x_old[k])/(x_old[k+1]-x_old[k])
+    return (1.-s)*u_old[k]+s*u_old[k+1]
+
+
+def _pchip_slopes(x, u):
+    #pentes monotones (Fritsch-Butland) : moyenne harmonique pondérée des
+    #pentes voisines, nulle aux extrema locaux
+    h = np.diff(x)
+    d = np.diff(u)/h
+    m = np.zeros(len(x))
+    w1 = 2*h[1:]+h[:-1]
+    w2 = h[1:]+2*h[:-1]
+    same = d[:-1]*d[1:] > 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        hm = (w1+w2)/(w1/d[:-1]+w2/d[1:])
+    m[1:-1] = np.where(same, hm, 0.)
+    #extrémités : formule à trois points, limitée pour rester monotone
+    for e, (h0, h1, d0, d1) in ((0, (h[0], h[1], d[0], d[1])),
+                               (-1, (h[-1], h[-2], d[-1], d[-2]))):
+        me = ((2*h0+h1)*d0-h0*d1)/(h0+h1)
+        if me*d0 <= 0:
+            me = 0.
+        elif d0*d1 <= 0 and abs(me) > abs(3*d0):
+            me = 3*d0
+        m[e] = me
+    return m
+
+
+def transfer_cubic(x_old, u_old, x_new):
+    """
+    Interpolation cubique d'Hermite monotone (type PCHIP) : pas de nouvel
+    extremum entre les nœuds de x_old. Linéaire si x_old a moins de 3 nœuds.
+    """
+    x_old = np.asarray(x_old)
+    if len(x_old) < 3:
+        return transfer_linear(x_old, u_old, x_new)
+    m = _pchip_slopes(x_old, u_old)
+    k = _locate(x_old, x_new)
+    h = x_old[k+1]-x_old[k]
+    s = (x_new-x_old[k])/h
+    s2 = s*s
+    s3 = s2*s
+    return ((2*s3-3*s2+1)*u_old[k]+(s3-2*s2+s)*h*m[k]
+            +(-2*s3+3*s2)*u_old[k+1]+(s3-s2)*h*m[k+1])
+
+
+def transfer_l2(x_old, u_old, x_new):
+    """
+    Projection L2 de u_old (P1 sur x_old) sur les P1 de x_new :
+    M u_new = b, b_i = int(phi_i u_old), M matrice de masse tridiagonale.
+    Les intégrales sont exactes (Simpson sur le maillage réunion des deux),
+    donc int(u_new) = int(u_old) sur [x_new[0], x_new[-1]].
+    """
+    x_old = np.asarray(x_old)
+    x_new = np.asarray(x_new)
+    n = len(x_new)
+    #maillage réunion (fusion sans doublons) restreint au domaine du nouveau maillage
+    s = _merge(x_old, x_new)[0]
+    s = s[np.concatenate(([True], s[1:] != s[:-1]))]
+    s = s[(s >= x_new[0]) & (s <= x_new[-1])]
+    a, b, mid = s[:-1], s[1:], 0.5*(s[:-1]+s[1:])
+    ds = b-a
+    #sur chaque segment u_old et les deux fonctions de base sont affines
+    ua, um, ub = (transfer_linear(x_old, u_old, p) for p in (a, mid, b))
+    j = _locate(x_new, mid)
+    hj = x_new[j+1]-x_new[j]
+    la, lm, lb = ((p-x_new[j])/hj for p in (a, mid, b))
+    #Simpson (exact pour le produit de deux affines)
+    right = ds/6*(la*ua+4*lm*um+lb*ub)
+    left = ds/6*((1-la)*ua+4*(1-lm)*um+(1-lb)*ub)
+    rhs = np.bincount(j, left, n)+np.bincount(j+1, right, n)
+    h = np.diff(x_new)
+    ab = np.zeros((3, n))
+    ab[0, 1:] = h/6
+    ab[1, :-1] += h/3
+    ab[1, 1:] += h/3
+    ab[2, :-1] = h/6
+    return solve_banded((1, 1), ab, rhs)
+
+
+_methods = {"linear": transfer_linear, "cubic": transfer_cubic, "l2": transfer_l2}
+
+
+def transfer(x_old, u_old, x_new, method="linear"):
+    #method : 'linear', 'cubic' (monotone) ou 'l2' (projection conservative)
+    try:
+        fun = _methods[method]
+    except KeyError:
+        raise ValueError("method doit être 'linear', 'cubic' ou 'l2'.")
+    return fun(x_old, np.asarray(u_old, dtype=float), np.asarray(x_new, dtype=float))
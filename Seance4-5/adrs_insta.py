@@ -2,23 +2,45 @@ import math
 import numpy as np
 import matplotlib.pyplot as plt
 
+import seances
+seances.use("Seance2")
+from sweep import mesh_sweep, print_table
+from adrs_kernel import adrs_residual
+from time_integration import LowStorageRK, EmbeddedRK
+
+
+#solution fabriquee separable Tex(x,t) = sin(4 pi t) v(x) : les profils en
+#espace sont calcules une fois par maillage, seuls les facteurs en temps changent
+_fex_cache={}
+
+def fex_profiles(NX,dx):
+    key=(NX,dx)
+    if key not in _fex_cache:
+        j=np.arange(1,NX-1)
+        v=np.zeros((NX))
+        v[1:-1]=(np.exp(-1000*((j-NX/3)/NX)**2)+np.exp(-10*np.exp(-1000*((j-NX/3)/NX)**2)))\
+            *np.sin(5*j*math.pi/NX)
+        vx=np.zeros((NX))
+        vxx=np.zeros((NX))
+        vx[1:-1]=(v[2:]-v[:-2])/(2*dx)
+        vxx[1:-1]=(v[2:]-2*v[1:-1]+v[:-2])/(dx**2)
+        _fex_cache[key]=(v,vx,V*vx-K*vxx+lamda*v)
+    return _fex_cache[key]
 
 def fex(NX,dx,time):
-    F = np.zeros((NX))
-    Tex = np.zeros((NX)) #np.sin(2*np.pi*x)
-    Text = np.zeros((NX)) #np.sin(2*np.pi*x)
-    Texx = np.zeros((NX)) #np.sin(2*np.pi*x)
-    for j in range (1,NX-1):
-        v=(np.exp(-1000*((j-NX/3)/NX)**2)+np.exp(-10*np.exp(-1000*((j-NX/3)/NX)**2)))\
-            *np.sin(5*j*math.pi/NX)
-        Tex[j] = np.sin(4*math.pi*time)*v
-        Text[j] = 4*math.pi*np.cos(4*math.pi*time)*v
-        
-    for j in range (1,NX-1):
-        Texx[j]=(Tex[j+1]-Tex[j-1])/(2*dx)  #np.cos(j*math.pi/NX)*math.pi/NX  
-        Txx=(Tex[j+1]-2*Tex[j]+Tex[j-1])/(dx**2)  #-np.sin(j*math.pi/NX)*(math.pi/NX)**2    #
-        F[j]=V*Texx[j]-K*Txx+lamda*Tex[j]+Text[j]
-    return F,Tex,Texx
+    #source, solution exacte et sa derivee (evaluation de l'erreur)
+    v,vx,Lv=fex_profiles(NX,dx)
+    st=np.sin(4*math.pi*time)
+    F=st*Lv+4*math.pi*np.cos(4*math.pi*time)*v
+    return F,st*v,st*vx
+
+def fex_source(NX,dx,time,out,work):
+    #source seule ecrite dans out (work : tampon de taille NX), sans allocation
+    v,vx,Lv=fex_profiles(NX,dx)
+    np.multiply(Lv,np.sin(4*math.pi*time),out=out)
+    np.multiply(v,4*math.pi*np.cos(4*math.pi*time),out=work)
+    out+=work
+    return out
 
 #u,t = -V u,x + k u,xx  -lamda u + f
 
@@ -38,26 +60,18 @@ ifre=100  #plot every ifre time iterations
 eps=0.001     #relative convergence ratio
 niter_refinement=20      #niter different calculations with variable mesh size
 
-irk_max=4
-alpha=np.zeros(irk_max)
-for irk in range(irk_max):
-    alpha[irk]=1/(irk_max-irk)
-    #print(alpha[irk])
-# if(irk_max==3):
-#     alpha[0]=0.333
-#     alpha[1]=0.5
-#     alpha[2]=1
-
-error=np.zeros((niter_refinement))
-
-NX_tab=[]
-Err_tab1=[]
-Err_tab2=[]
-
-for iter in range (niter_refinement):
-    NX=NX+3
-    NX_tab.append(NX)
-    
+#integrateur en temps (time_integration.py) : rk1, rk2, rk3, rk4, ssprk3,
+#ou jameson<s> (alpha[irk]=1/(irk_max-irk) des versions precedentes)
+scheme="rk4"
+#pas adaptatif : paire emboitee Bogacki-Shampine 3(2) + controleur PI,
+#borne par le pas CFL ci-dessous (remplace scheme)
+adaptive_dt=False
+rtol=1e-4
+atol=1e-6
+
+
+def solve_mesh(NX):
+    #calcul instationnaire complet sur un maillage a NX points (sans trace, pour mesh_sweep)
     dx = L/(NX-1)                 #Grid step (space)
     dt = dx**2/(V*dx+K+dx**2)   #Grid step (time)  condition CFL de stabilite 10.4.5
     print("Nbre points in space, Time step:",dx,dt)
@@ -68,10 +82,24 @@ for iter in range (niter_refinement):
     x = np.linspace(0.0,1.0,NX)
     T = np.zeros((NX)) #np.sin(2*np.pi*x)
     F = np.zeros((NX))
+    F_work = np.zeros((NX))
     rest = []
-
-    plt.figure(1)
-
+    snapshots = []
+    err_half = []
+    xnu=K+0.5*dx*abs(V)
+    if adaptive_dt:
+        rk=EmbeddedRK(NX,rtol=rtol,atol=atol)
+    else:
+        rk=LowStorageRK(scheme,NX)
+    dt_next=dt
+    #tampons du second membre, alloues une fois avec ceux de l'integrateur
+    src=np.zeros((NX))
+    src_work=np.zeros((NX))
+    res_work=np.zeros((NX-2))
+
+    def rhs(T,t,out):
+        fex_source(NX,dx,t,src,src_work)
+        adrs_residual(T,src,dx,1.,V,xnu,lamda,out,res_work)
 
     # Main loop en temps
     #for n in range(0,NT):
@@ -80,73 +108,96 @@ for iter in range (niter_refinement):
     res0=1
     time=0
     time_total=1
+    t_half=0.5
     time_tab=[]
     while(time<time_total): #n<NT and res/res0>eps):
         n+=1
-        F,Tex,Texx=fex(NX,dx,time)
-                        
-        dt = dx**2/(V*dx+2*K+abs(np.max(F))*dx**2)   #Grid step (time)  condition CFL de stabilite 10.4.5
-        time+=dt
-        time_tab.append(time)
-        
-        T0=T.copy()
-
-        for irk in range(irk_max):
+        fex_source(NX,dx,time,F,F_work)
+
+        dt_stab = dx**2/(V*dx+2*K+abs(np.max(F))*dx**2)   #Grid step (time)  condition CFL de stabilite 10.4.5
+        dt = min(dt_next,dt_stab) if adaptive_dt else dt_stab
+        #pas raccourci pour qu'un pas tombe exactement sur t=0.5 (erreur a mi-parcours)
+        half = time < t_half <= time+dt
+        if half:
+            dt = t_half-time
         #discretization of the advection/diffusion/reaction/source equation
-            res=0
-            for j in range (1, NX-1):
-                xnu=K+0.5*dx*abs(V) 
-                Tx=(T[j+1]-T[j-1])/(2*dx)
-                Txx=(T[j-1]-2*T[j]+T[j+1])/(dx**2)
-                RHS = dt*(-V*Tx+xnu*Txx-lamda*T[j]+F[j])
-                res+=abs(RHS)
-                T[j] = T0[j] + RHS*alpha[irk]
+        #(source evaluee au temps de chaque etage)
+        if adaptive_dt:
+            h=dt
+            dt,dt_new=rk.step(T,time,h,rhs,dt_max=dt_stab)
+            half = half and dt==h
+            #pas raccourci accepte : la proposition precedente reste valable
+            dt_next = max(dt_new,dt_next) if half else dt_new
+        else:
+            rk.step(T,time,dt,rhs)
+        res=dt*np.sum(np.abs(rk.k[1:-1]))
+        time = t_half if half else time+dt
+        time_tab.append(time)
+        _,Tex,Texx=fex(NX,dx,time)   #solution exacte au nouveau temps
 
         if (n == 1 ):
             res0=res
         rest.append(res)
-    #Plot every ifre time steps
+    #Plot every ifre time steps (snapshots traces apres le balayage)
         if (n%ifre == 0 or (res/(res0+1.e-10))<eps):
             print("iteration, residual:",n,res)
+            snapshots.append((n, dt, T.copy(), Tex.copy()))
+
+        err=np.dot(T-Tex,T-Tex)*dx
+        errh1=dx*np.sum((Texx[1:-1]-(T[2:]-T[:-2])/(2*dx))**2)
+
+        error=np.sqrt(err)/NX
+        #print('norm error=',error)
+
+        if half:
+            err_half.append(error)
+
+    if adaptive_dt:
+        print("NX, accepted/rejected steps:",NX,rk.accepted,rk.rejected)
+    rejected=rk.rejected if adaptive_dt else 0
+
+    return dict(N=NX, h=dx, errL2=error, errH1=np.sqrt(errh1), steps=n,
+                rejected=rejected, err_half=err_half, x=x, T=T, rest=rest, time_tab=time_tab,
+                snapshots=snapshots)
+
+
+if __name__ == "__main__":
+    NX_tab=[NX+3*(iter+1) for iter in range(niter_refinement)]
+    table,outputs=mesh_sweep(solve_mesh,NX_tab)
+    print_table(table)
+
+    Err_tab1=[]
+    Err_tab2=[]
+    for out in outputs:
+        plt.figure(1)
+        for n,dt,Tn,Texn in out["snapshots"]:
             plotlabel = "t = %1.2f" %(n * dt)
-            plt.plot(x,T, label=plotlabel,color = plt.get_cmap('copper')(float(n)/NT))
-            plt.plot(x,Tex, label=plotlabel,color = "green")              
+            plt.plot(out["x"],Tn, label=plotlabel,color = plt.get_cmap('copper')(float(n)/NT))
+            plt.plot(out["x"],Texn, label=plotlabel,color = "green")
             plt.xlabel(u'$x$', fontsize=26)
             plt.ylabel(u'$T$', fontsize=26, rotation=0)
             plt.title(u'ADRS 1D')
             #plt.legend()
-               
-        err=np.dot(T-Tex,T-Tex)*dx
-        errh1=0
-        for j in range (1,NX-1):
-            errh1+=dx*(Texx[j]-(T[j+1]-T[j-1])/(2*dx))**2
-           
-        error[iter]=np.sqrt(err)/NX
-        #print('norm error=',error[iter])
 
-        if(abs(time-0.5)<dt*0.5):
-            Err_tab1.append(error[iter])
+        Err_tab1.extend(out["err_half"])
+        Err_tab2.append(out["errL2"])
 
-    Err_tab2.append(error[iter])
+        plt.figure(2)
+        plt.plot(np.array(out["time_tab"]),out["rest"])
 
-    
-    plt.figure(2)
-    plt.plot(np.array(time_tab),rest)
+    plt.figure(3)
+    NX_tab=np.array(NX_tab)
+    Err_tab1=np.array(Err_tab1)
+    Err_tab2=np.array(Err_tab2)
+    print(len(NX_tab),len(Err_tab1),len(Err_tab2))
 
-plt.figure(3)
-NX_tab=np.array(NX_tab)
-Err_tab1=np.array(Err_tab1)
-Err_tab2=np.array(Err_tab2)
-print(len(NX_tab),len(Err_tab1),len(Err_tab2))
-
-plt.plot(Err_tab1,NX_tab,label="0.5 sec")
-plt.plot(Err_tab2,NX_tab,label="1 sec")
-plt.ylabel(u'$Nx$', fontsize=14)
-plt.xlabel(u'$LÂ² Error$', fontsize=14, rotation=90)
-plt.title(u'Error at 2 different times for different meshes')
-plt.legend()
+    plt.plot(Err_tab1,NX_tab,label="0.5 sec")
+    plt.plot(Err_tab2,NX_tab,label="1 sec")
+    plt.ylabel(u'$Nx$', fontsize=14)
+    plt.xlabel(u'$LÂ² Error$', fontsize=14, rotation=90)
+    plt.title(u'Error at 2 different times for different meshes')
+    plt.legend()
 
 
 # plt.figure(3)
 # plt.plot(x,Tex, label=plotlabel,color = plt.get_cmap('copper')(float(n)/NT))
-
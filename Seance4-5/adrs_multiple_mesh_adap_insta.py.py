@@ -2,6 +2,13 @@ import math
 import numpy as np
 import matplotlib.pyplot as plt
 
+import seances
+seances.use("Seance3-4")
+from remesh import remesh_from_hloc
+from transfer import transfer
+from nonuniform_ops import NonUniformOperators, MetricAccumulator
+from time_integration import LowStorageRK, EmbeddedRK
+
 #u,t = -V u,x + k u,xx  -lamda u + (src?) src est donne pour forcer u=uex
 #uex,t + V uex,x - k uex,xx  + lamda uex = src = F[j]*np.sin(freq*t)+Tex[j]*np.cos(freq*t)*freq
 
@@ -30,156 +37,234 @@ NX = 10    #Number of grid points : initialization
 NT = 1000   #Number of time steps max
 ifre=1000000  #plot every ifre time iterations
 eps=0.001     #relative convergence ratio
+scheme="ssprk3"  #integrateur en temps (time_integration.py) : rk1..rk4, ssprk3
+adaptive_dt=False  #pas adaptatif Bogacki-Shampine 3(2) + PI, borne par le pas stable
+rtol=1e-3
+atol=1e-5
 
-for metric_insta in [False, True]:
-    
-    errorL2=[]
-    errorH1=[]
-    itertab=[]
-    hloc = np.ones((NX))*hmax*0.5
-    
-    itera=0
-    NX0=0
-    while( np.abs(NX0-NX) > -10 and itera<niter_refinement):
+#adaptation espace-temps par fenetres : [0,Time] coupe en nwindow fenetres,
+#metrique accumulee en flux sur chaque fenetre ('mean' ou 'max'), la fenetre
+#est recalculee niter_window fois sur le maillage adapte, et le dernier
+#maillage sert de depart a la fenetre suivante (transfert de la solution)
+windowed=False
+nwindow=4
+niter_window=2
+window_metric="mean"
+transfer_method="linear"   #transfert de la solution entre maillages : linear, cubic, l2
+
+
+def make_rhs(ops,F,Tex,xnu):
+    #second membre L(T,t) = residu avec src = F sin(freq t) + Tex cos(freq t) freq ;
+    #tampons alloues une fois par maillage, avec ceux de l'integrateur
+    NX=ops.NX
+    src=np.zeros((NX))
+    src_work=np.zeros((NX))
+    res_work=np.zeros((2,NX-2))
+
+    def rhs(T,t,out):
+        np.multiply(F,np.sin(freq*t),out=src)
+        np.multiply(Tex,np.cos(freq*t),out=src_work)
+        np.multiply(src_work,freq,out=src_work)
+        np.add(src,src_work,out=src)
+        ops.residual(T,src,1.,V,xnu,lamda,out,res_work)
+    return rhs
+
+def advance_window(x,T,t0,t1,acc):
+    #avance T (maillage x) de t0 a t1 en accumulant la metrique dans acc
+    NX=len(x)
+    ops=NonUniformOperators(x)
+    xnu=ops.viscosity(K,V,coef=0.25)
+    Tex = np.zeros((NX))
+    Tex[1:-1] = np.exp(-20*(x[1:-1]-(xmax+xmin)*0.5)**2)
+    F = np.zeros((NX))
+    F[1:-1]=V*ops.gradient(Tex)-K*ops.laplacian(Tex)+lamda*Tex[1:-1]
+    dt=np.min(ops.stable_dt(V,K,F,coef=0.25))
+    rk=LowStorageRK(scheme,NX)
+    rhs=make_rhs(ops,F,Tex,xnu)
+
+    def bc(T):
+        T[0]=0
+        #sortie a gradient nul : l'extrapolation T[NX-1]=2T[NX-2]-T[NX-3] (Txx=0)
+        #donne une valeur propre positive apres une grande derniere maille
+        T[NX-1]=T[NX-2]
+
+    n=0
+    t=t0
+    while(t1-t>1.e-12*Time):
+        n+=1
+        dtn=min(dt,t1-t)
+        acc.add(ops.metric(ops.laplacian(T),hmin,hmax,err),dtn)
+        rk.step(T,t,dtn,rhs,bc)
+        t+=dtn
+    return T,ops,Tex,n
+
+#adaptation par fenetres, ou passes d'adaptation sur toute la simulation
+if(windowed):
+    t_win=np.linspace(0,Time,nwindow+1)
+    #premiere fenetre sur le maillage uniforme initial a NX points
+    x=np.linspace(xmin,xmax,NX)
+    T=np.zeros((NX))
+    errwin=[]
+    for w in range(nwindow):
+        T0=T.copy()
+        for it in range(niter_window):
+            T=T0.copy()
+            acc=MetricAccumulator(len(x)-2,window_metric)
+            T,ops,Tex,n=advance_window(x,T,t_win[w],t_win[w+1],acc)
+            metric=np.zeros((len(x)))
+            metric[1:-1]=acc.value()
+            metric[0]=metric[1]
+            metric[-1]=metric[-2]
+            hloc=np.sqrt(1./metric)
+            if(it<niter_window-1):
+                #fenetre recalculee sur le maillage adapte, depart transfere
+                xnew,_=remesh_from_hloc(x,hloc,T0,xmin,xmax,hmin,hmax)
+                T0=transfer(x,T0,xnew,transfer_method)
+                x=xnew
+        #erreur en fin de fenetre par rapport a Tex*sin(freq t)
+        errL2h=np.sum(ops.cell*(T[1:-1]-Tex[1:-1]*np.sin(freq*t_win[w+1]))**2)
+        errwin.append(errL2h)
+        print('window',w,'t=',t_win[w+1],'NX=',len(x),'steps=',n,'norm error L2=',errL2h)
+        #maillage de la fenetre suivante et transfert de la solution
+        xnew,_=remesh_from_hloc(x,hloc,T,xmin,xmax,hmin,hmax)
+        T=transfer(x,T,xnew,transfer_method)
+        x=xnew
+
+    plt.figure()
+    plt.plot(t_win[1:],errwin,marker='o',label='windowed '+window_metric)
+
+else:
+    NX_init=NX
+    for metric_insta in [False, True]:
     
-        itertab.append((xmax-xmin)/NX)
-        itera+=1
-        
+        errorL2=[]
+        errorH1=[]
+        itertab=[]
+        NX=NX_init
+        hloc = np.ones((NX))*hmax*0.5
         x = np.linspace(xmin,xmax,NX)
         T = np.zeros((NX))
     
-    #mesh adaptation using local metric
-        if(itera>0):
-            xnew=[]
-            Tnew=[]        
-            nnew=1
-            xnew.append(xmin)
-            Tnew.append(T[0])        
-            while(xnew[nnew-1] < xmax-hmin):
-                for i in range(0,NX-1):
-                    if(xnew[nnew-1] >= x[i] and xnew[nnew-1] <= x[i+1] and xnew[nnew-1]<xmax-hmin):
-                        hll=(hloc[i]*(x[i+1]-xnew[nnew-1])+hloc[i+1]*(xnew[nnew-1]-x[i]))/(x[i+1]-x[i])
-                        hll=min(max(hmin,hll),hmax)
-                        nnew+=1
-    #                    print(nnew,hll,min(xmax,xnew[nnew-2]+hll))
-                        xnew.append(min(xmax,xnew[nnew-2]+hll))                
-    #solution interpolation for initialization (attention initial solution on first mesh in the row)
-                        un=(T[i]*(x[i+1]-xnew[nnew-1])+T[i+1]*(xnew[nnew-1]-x[i]))/(x[i+1]-x[i])
-                        Tnew.append(un)
+        itera=0
+        NX0=0
+        while( np.abs(NX0-NX) > -10 and itera<niter_refinement):
+    
+            itertab.append((xmax-xmin)/NX)
+            itera+=1
+    
+        #mesh adaptation using local metric
+            if(itera>0):
+        #new nodes from hloc (defined on the previous mesh) + transfer of the previous solution for initialization
+        #(Time multiple de la periode du forcage : l'etat final du passage precedent est celui de t=0)
+                xnew,_=remesh_from_hloc(x,hloc,T,xmin,xmax,hmin,hmax)
+                T=transfer(x,T,xnew,transfer_method)
+                T[0]=0
+                T[-1]=T[-2]
+                nnew=len(xnew)
                         
-            NX0=NX
-            NX=nnew
-            x = np.linspace(xmin,xmax,NX)
-            x[0:NX]=xnew[0:NX]
-            #print(x)
-            T = np.zeros((NX))
-            T[0:NX]=Tnew[0:NX]
-    #        T[NX-1]=0
+                NX0=NX
+                NX=nnew
+                x = xnew
         
-        rest = []
-        F = np.zeros((NX))
-        RHS = np.zeros((NX))
-        hloc = np.ones((NX))*hmax*0.5
-        metric = np.zeros((NX))
+            rest = []
+            F = np.zeros((NX))
+            hloc = np.ones((NX))*hmax*0.5
+            metric = np.zeros((NX))
+    
+            #geometric coefficients computed once per mesh
+            ops=NonUniformOperators(x)
+        #viscosite numerique : decentrage pour stabilite de derivee premiere/advection 12.17
+            xnu=ops.viscosity(K,V,coef=0.25) #0.5 h |V|
     
-        Tex = np.zeros((NX))
-        for j in range (1,NX-1):
-            Tex[j] = np.exp(-20*(x[j]-(xmax+xmin)*0.5)**2)
+            Tex = np.zeros((NX))
+            Tex[1:-1] = np.exp(-20*(x[1:-1]-(xmax+xmin)*0.5)**2)
             
-        dt=1.e30
-        for j in range (1,NX-1):
-            Tx=(Tex[j+1]-Tex[j-1])/(x[j+1]-x[j-1])
-            Txip1=(Tex[j+1]-Tex[j])/(x[j+1]-x[j])
-            Txim1=(Tex[j]-Tex[j-1])/(x[j]-x[j-1])
-            Txx=(Txip1-Txim1)/(0.5*(x[j+1]+x[j])-0.5*(x[j]+x[j-1]))
-            F[j]=V*Tx-K*Txx+lamda*Tex[j]
-            dt=min(dt,0.25*(x[j+1]-x[j-1])**2/(V*np.abs(x[j+1]-x[j-1])+4*K+np.abs(F[j])*(x[j+1]-x[j-1])**2))
+            F[1:-1]=V*ops.gradient(Tex)-K*ops.laplacian(Tex)+lamda*Tex[1:-1]
+            dt=np.min(ops.stable_dt(V,K,F,coef=0.25))
+            dt_stab=dt
+            if adaptive_dt:
+                rk=EmbeddedRK(NX,rtol=rtol,atol=atol)
+            else:
+                rk=LowStorageRK(scheme,NX)
+            rhs=make_rhs(ops,F,Tex,xnu)
+
+            def bc(T):
+                T[0]=0
+                #sortie a gradient nul : l'extrapolation T[NX-1]=2T[NX-2]-T[NX-3] (Txx=0)
+                #donne une valeur propre positive apres une grande derniere maille
+                T[NX-1]=T[NX-2]
     
-        print('NX=',NX,'Dt=',dt)        
+            print('NX=',NX,'Dt=',dt)        
     
-        #time step loop
-        n=0
-        res=1
-        res0=1
-        t=0
-        while(n<NT and t<Time):
-            n+=1
-            dt=min(dt,Time-t)
-            t+=dt
-              
-        #discretization of the advection/diffusion/reaction/source equation
-            res=0
-            for j in range (1, NX-1):
-    #viscosite numerique : decentrage pour stabilite de derivee premiere/advection 12.17
-                visnum=0.25*(0.5*(x[j+1]+x[j])-0.5*(x[j]+x[j-1]))*np.abs(V) #0.5 h |V|
-                xnu=K+visnum            
-                Tx=(T[j+1]-T[j-1])/(x[j+1]-x[j-1])
-                Txip1=(T[j+1]-T[j])/(x[j+1]-x[j])
-                Txim1=(T[j]-T[j-1])/(x[j]-x[j-1])
-                Txx=(Txip1-Txim1)/(0.5*(x[j+1]+x[j])-0.5*(x[j]+x[j-1]))
-                src=F[j]*np.sin(freq*t)+Tex[j]*np.cos(freq*t)*freq
-                RHS[j] = dt*(-V*Tx+xnu*Txx-lamda*T[j]+src)
+            #time step loop
+            n=0
+            res=1
+            res0=1
+            t=0
+            while(n<NT and t<Time):
+                n+=1
+                dt=min(dt,Time-t)
+                Txx=ops.laplacian(T)
+
+            #discretization of the advection/diffusion/reaction/source equation
+                if adaptive_dt:
+                    dt,dt_next=rk.step(T,t,dt,rhs,bc,dt_max=dt_stab)
+                else:
+                    rk.step(T,t,dt,rhs,bc)
+                res=dt*np.sum(np.abs(rk.k[1:-1]))
+                t+=dt
                 if(metric_insta):
-                    metric[j]+=min(1./hmin**2,max(1./hmax**2,abs(Txx)/err))
+                    metric[1:-1]+=ops.metric(Txx,hmin,hmax,err)
                 elif(metric_insta==False and (n==NT or t>=Time)):
-                    metric[j]=min(1./hmin**2,max(1./hmax**2,abs(Txx)/err))            
-                res+=abs(RHS[j])
-    
-            metric[0]=metric[1]
-            metric[NX-1]=metric[NX-2]
+                    metric[1:-1]=ops.metric(Txx,hmin,hmax,err)
     
-            for j in range (1, NX-1):
-                T[j] += RHS[j]   #Tn+1 = Tn + dt*(-V*Tx+xnu*Txx-lamda*T[j]+src)
-                RHS[j]=0
-                
-        
-            T[0]=0
-            T[NX-1]=2*T[NX-2]-T[NX-3]  #Txx=0 second derivative
+                metric[0]=metric[1]
+                metric[NX-1]=metric[NX-2]
     
-            if (n == 1 ):
-                res0=res
+                if (n == 1 ):
+                    res0=res
     
-            rest.append(res)
-        #Plot every ifre time steps
-    #         if (n%ifre == 0 or t>=Time):
-    #             plt.figure()
-    #             #print('iter=',n,'residual=',res)
-    #             plotlabel = "iter adapt = %1.0f" %itera
-    # #            plotlabel = "t = %1.2f" %t
-    #             plt.plot(x[0:NX],T[0:NX], label=plotlabel,linestyle='--', marker='o')
+                rest.append(res)
+                if adaptive_dt:
+                    dt=dt_next
+            #Plot every ifre time steps
+        #         if (n%ifre == 0 or t>=Time):
+        #             plt.figure()
+        #             #print('iter=',n,'residual=',res)
+        #             plotlabel = "iter adapt = %1.0f" %itera
+        # #            plotlabel = "t = %1.2f" %t
+        #             plt.plot(x[0:NX],T[0:NX], label=plotlabel,linestyle='--', marker='o')
           
-        if(metric_insta):
-            metric[0:NX]/=n  #average (intersect) over n iterations
+            if(metric_insta):
+                metric[0:NX]/=n  #average (intersect) over n iterations
            
-        hloc[0:NX]=np.sqrt(1./metric[0:NX])
+            hloc[0:NX]=np.sqrt(1./metric[0:NX])
         
-        # print('iter=',n,'time=',t,'residual=',res)
-        # plt.xlabel(u'$x$', fontsize=26)
-        # plt.ylabel(u'$T$', fontsize=26, rotation=0)
-        # plt.title(u'ADRS insta 1D')
-        #plt.legend()
+            # print('iter=',n,'time=',t,'residual=',res)
+            # plt.xlabel(u'$x$', fontsize=26)
+            # plt.ylabel(u'$T$', fontsize=26, rotation=0)
+            # plt.title(u'ADRS insta 1D')
+            #plt.legend()
     
-        # plt.figure()
-        # plt.plot(np.log10(rest/rest[0]))
-        # plt.show()
+            # plt.figure()
+            # plt.plot(np.log10(rest/rest[0]))
+            # plt.show()
     
-    # #    errL2=np.sqrt(np.dot(T-Tex,T-Tex))
-        errH1h=0
-        errL2h=0
-        for j in range (1, NX-1):
-            Texx=(Tex[j+1]-Tex[j-1])/(x[j+1]-x[j-1])
-            Tx=(T[j+1]-T[j-1])/(x[j+1]-x[j-1])
-            errL2h+=(0.5*(x[j+1]+x[j])-0.5*(x[j]+x[j-1]))*(T[j]-Tex[j])**2
-            errH1h+=(0.5*(x[j+1]+x[j])-0.5*(x[j]+x[j-1]))*(Tx-Texx)**2
+        # #    errL2=np.sqrt(np.dot(T-Tex,T-Tex))
+            errL2h=np.sum(ops.cell*(T[1:-1]-Tex[1:-1])**2)
+            errH1h=np.sum(ops.cell*(ops.gradient(T)-ops.gradient(Tex))**2)
     
-        errorL2.append(errL2h)
-        errorH1.append(errL2h+errH1h)
+            errorL2.append(errL2h)
+            errorH1.append(errL2h+errH1h)
         
         
-        print(metric_insta,itera,'norm error L2, H1=',errL2h,errH1h)
+            print(metric_insta,itera,'norm error L2, H1=',errL2h,errH1h)
+            if adaptive_dt:
+                print('accepted/rejected steps:',rk.accepted,rk.rejected,'t=',t)
     
-    #    plt.figure(3)
-    plt.plot(errorL2,label=str(metric_insta))
-    #plt.plot(np.log10(errorH1))    
+        #    plt.figure(3)
+        plt.plot(errorL2,label=str(metric_insta))
+        #plt.plot(np.log10(errorH1))    
+
 plt.legend()
 plt.show()
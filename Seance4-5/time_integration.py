@@ -0,0 +1,214 @@
+import numpy as np
+
+#intégrateurs Runge-Kutta bas stockage pour u,t = L(u,t), sur tableaux
+#entiers avec tampons préalloués (aucune allocation par étage)
+
+# forme 2N (Williamson) : dU = A_i dU + dt L(U, t+c_i dt) ; U += B_i dU
+_2N = {
+    "rk1": ([0.], [1.], [0.]),
+    "rk2": ([0., -1.], [1., 0.5], [0., 1.]),   #Heun
+    "rk3": ([0., -5/9, -153/128], [1/3, 15/16, 8/15], [0., 1/3, 3/4]),
+    #Carpenter-Kennedy, 5 étages, ordre 4
+    "rk4": ([0.,
+             -567301805773/1357537059087,
+             -2404267990393/2016746695238,
+             -3550918686646/2091501179385,
+             -1275806237668/842570457699],
+            [1432997174477/9575080441755,
+             5161836677717/13612068292357,
+             1720146321549/2090206949498,
+             3134564353537/4481467310338,
+             2277821191437/14882151754819],
+            [0.,
+             1432997174477/9575080441755,
+             2526269341429/6820363266100,
+             2006345519317/3224310063776,
+             2802321613138/2924317926251]),
+}
+
+# SSP-RK3 (Shu-Osher) : U = a_i u0 + (1-a_i) (U + dt L(U, t+c_i dt))
+_SSP = {
+    "ssprk3": ([0., 0.75, 1/3], [0., 1., 0.5]),
+}
+
+ORDER = {"rk1": 1, "rk2": 2, "rk3": 3, "rk4": 4, "ssprk3": 3}
+
+
+def jameson_alpha(irk_max):
+    #schéma des scripts d'origine : U = u0 + alpha_k dt L(U), alpha_k = 1/(irk_max-k)
+    #(ordre irk_max pour un opérateur linéaire autonome)
+    return [1/(irk_max-irk) for irk in range(irk_max)]
+
+
+class LowStorageRK:
+    """
+    Pas de temps RK sur un tableau T de taille n, modifié en place.
+
+    scheme : 'rk1', 'rk2', 'rk3', 'rk4' (forme 2N), 'ssprk3', ou
+             'jameson<s>' (s étages alpha_k = 1/(s-k), cf. jameson_alpha).
+    rhs(U, t, out) doit écrire L(U,t) dans out (nœuds de bord laissés à 0 si
+    la condition limite est imposée par bc) ; bc(U), optionnel, est appliqué
+    après chaque étage.
+
+    Après step, self.k contient L du dernier étage (résidu des scripts :
+    dt*sum|k|).
+    """
+    def __init__(self, scheme, n):
+        self.scheme = scheme
+        if scheme in _2N:
+            self.kind = "2N"
+            self.A, self.B, self.c = _2N[scheme]
+            self.order = ORDER[scheme]
+        elif scheme in _SSP:
+            self.kind = "ssp"
+            self.a, self.c = _SSP[scheme]
+            self.order = ORDER[scheme]
+        elif scheme.startswith("jameson"):
+            self.kind = "jameson"
+            self.alpha = jameson_alpha(int(scheme[len("jameson"):]))
+            self.c = [0.]+self.alpha[:-1]
+            self.order = len(self.alpha)
+        else:
+            raise ValueError("scheme doit être 'rk1', 'rk2', 'rk3', 'rk4', 'ssprk3' ou 'jameson<s>'.")
+        self.stages = len(self.c)
+        self.k = np.zeros(n)    #L(U) de l'étage courant
+        self.dU = np.zeros(n)   #incrément 2N, ou u0 pour ssp/jameson
+        self.w = np.zeros(n)    #tampon de travail
+
+    def step(self, T, t, dt, rhs, bc=None):
+        k, dU, w = self.k, self.dU, self.w
+        if self.kind == "2N":
+            dU[:] = 0.
+            for A, B, c in zip(self.A, self.B, self.c):
+                rhs(T, t+c*dt, k)
+                dU *= A
+                np.multiply(k, dt, out=w)
+                dU += w
+                np.multiply(dU, B, out=w)
+                T += w
+                if bc is not None:
+                    bc(T)
+        elif self.kind == "ssp":
+            dU[:] = T
+            for a, c in zip(self.a, self.c):
+                rhs(T, t+c*dt, k)
+                np.multiply(k, dt, out=w)
+                T += w
+                if a:
+                    T *= 1.-a
+                    np.multiply(dU, a, out=w)
+                    T += w
+                if bc is not None:
+                    bc(T)
+        else:
+            dU[:] = T
+            for alpha, c in zip(self.alpha, self.c):
+                rhs(T, t+c*dt, k)
+                np.multiply(k, alpha*dt, out=w)
+                np.add(dU, w, out=T)
+                if bc is not None:
+                    bc(T)
+        return T
+
+
+class EmbeddedRK:
+    """
+    Bogacki-Shampine 3(2) (FSAL) avec contrôle du pas : le pas est choisi par
+    un contrôleur PI sur l'estimation d'erreur de la paire emboîtée, borné
+    par dt_max (limite de stabilité du schéma explicite).
+
+    Norme d'erreur : moyenne quadratique aux nœuds intérieurs de
+    err_j/(atol + rtol*max(|T0_j|,|T1_j|)) ; pas accepté si <= 1.
+    self.accepted / self.rejected comptent les pas acceptés / rejetés ;
+    après step, self.k contient L au nouvel état (résidu des scripts) et sert
+    de premier étage au pas suivant (FSAL) ; reset() invalide ce premier étage.
+    """
+    order = 3
+
+    def __init__(self, n, rtol=1e-3, atol=1e-6, safety=0.9, fac_min=0.2, fac_max=5.):
+        self.rtol, self.atol = rtol, atol
+        self.safety, self.fac_min, self.fac_max = safety, fac_min, fac_max
+        #exposants PI (Gustafsson) pour une estimation d'ordre 2 : q = 3
+        self.kI, self.kP = 0.7/3, 0.4/3
+        self.k1, self.k2, self.k3, self.k4 = (np.zeros(n) for _ in range(4))
+        self.y0 = np.zeros(n)
+        self.w = np.zeros(n)
+        self.e = np.zeros(n)
+        self.k = self.k1
+        self.accepted = 0
+        self.rejected = 0
+        self.reset()
+
+    def reset(self):
+        #à appeler si T ou t sont modifiés hors de step (remaillage, reprise...)
+        self._fsal_valid = False
+        self.err_prev = 1e-4
+
+    def _error(self, T, dt):
+        k1, k2, k3, k4, w, e = self.k1, self.k2, self.k3, self.k4, self.w, self.e
+        #dt*(b - b*).k avec b* = (7/24, 1/4, 1/3, 1/8)
+        np.multiply(k1, -5/72*dt, out=w)
+        np.multiply(k2, dt/12, out=e)
+        w += e
+        np.multiply(k3, dt/9, out=e)
+        w += e
+        np.multiply(k4, -dt/8, out=e)
+        w += e
+        np.maximum(np.abs(self.y0), np.abs(T), out=e)
+        e *= self.rtol
+        e += self.atol
+        np.divide(w, e, out=w)
+        return np.sqrt(np.mean(w[1:-1]**2))
+
+    def step(self, T, t, dt, rhs, bc=None, dt_max=np.inf):
+        """
+        Avance T (en place) d'un pas accepté à partir de t, en essayant
+        d'abord min(dt, dt_max). Retourne (dt_pris, dt_suivant).
+        """
+        y0, w = self.y0, self.w
+        y0[:] = T
+        #premier étage : L(T0, t) du pas accepté précédent (FSAL) si valide
+        if not self._fsal_valid:
+            rhs(T, t, self.k1)
+            self._fsal_valid = True
+        while True:
+            dt = min(dt, dt_max)
+            k1, k2, k3, k4 = self.k1, self.k2, self.k3, self.k4
+            np.multiply(k1, 0.5*dt, out=w)
+            np.add(y0, w, out=T)
+            if bc is not None:
+                bc(T)
+            rhs(T, t+0.5*dt, k2)
+            np.multiply(k2, 0.75*dt, out=w)
+            np.add(y0, w, out=T)
+            if bc is not None:
+                bc(T)
+            rhs(T, t+0.75*dt, k3)
+            np.multiply(k1, 2/9*dt, out=w)
+            np.add(y0, w, out=T)
+            np.multiply(k2, dt/3, out=w)
+            T += w
+            np.multiply(k3, 4/9*dt, out=w)
+            T += w
+            if bc is not None:
+                bc(T)
+            rhs(T, t+dt, k4)
+            err = self._error(T, dt)
+            if err <= 1.:
+                break
+            #rejet : retour à T0, pas réduit sans terme PI (k1 = L(T0, t) reste valable)
+            self.rejected += 1
+            T[:] = y0
+            dt *= max(self.fac_min, self.safety*err**(-1/3))
+        self.accepted += 1
+        if err == 0.:
+            fac = self.fac_max
+        else:
+            fac = self.safety*err**(-self.kI)*self.err_prev**self.kP
+            fac = min(self.fac_max, max(self.fac_min, fac))
+        self.err_prev = max(err, 1e-4)
+        #FSAL : L au nouvel état sert de premier étage au pas suivant
+        self.k1, self.k4 = k4, k1
+        self.k = self.k1
+        self._fsal_valid = True
+        return dt, min(dt*fac, dt_max)
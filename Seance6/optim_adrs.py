@@ -2,6 +2,11 @@ import math
 import numpy as np
 import matplotlib.pyplot as plt
 from scipy.optimize import minimize
+from scipy.linalg import cho_factor, cho_solve, solve_banded
+
+import seances
+seances.use("Seance2")
+from adrs_kernel import adrs_residual, adrs_step
 
 def ADRS(NX,xcontrol,Target):
         
@@ -51,17 +56,8 @@ def ADRS(NX,xcontrol,Target):
     while(n<NT and res>eps*res0): #
         n+=1
     #discretization of the advection/diffusion/reaction/source equation
-        res=0
-        for j in range (1, NX-1):
-            xnu=K+0.5*dx*abs(V) 
-            Tx=(T[j+1]-T[j-1])/(2*dx)
-            Txx=(T[j-1]-2*T[j]+T[j+1])/(dx**2)
-            RHS[j] = dt*(-V*Tx+xnu*Txx-lamda*T[j]+F[j])
-            res+=abs(RHS[j])
-
-        for j in range (1, NX-1):
-            T[j] += RHS[j]
-            RHS[j]=0
+        xnu=K+0.5*dx*abs(V)
+        res=adrs_step(T,F,dx,dt,V,xnu,lamda,RHS)
 
 
         if (n == 1 ):
@@ -82,8 +78,144 @@ def ADRS(NX,xcontrol,Target):
     
     return cost,T
 
+def ADRS_batch(NX,X_controls,Target):
+    """
+    Meme calcul que ADRS pour plusieurs vecteurs de controle a la fois.
+    X_controls : tableau (n_controls, nbc) ; les n_controls solutions sont
+    avancees ensemble dans un tableau (n_controls, NX), chacune avec son
+    propre dt (CFL) et son propre critere d'arret res>eps*res0.
+    Retourne (costs, T) de formes (n_controls,) et (n_controls, NX).
+    """
+    # PHYSICAL PARAMETERS (memes que ADRS)
+    K = 0.1     #Diffusion coefficient
+    L = 1.0     #Domain size
+    V=1
+    lamda=1
+
+    # NUMERICAL PARAMETERS
+    NT = 1000   #Number of time steps max
+    eps=0.0001     #relative convergence ratio
+
+    X_controls=np.atleast_2d(X_controls)
+    nsol=X_controls.shape[0]
+    dx = L/(NX-1)
+    x = np.linspace(0.0,1.0,NX)
+    xnu=K+0.5*dx*abs(V)
+
+    T = np.zeros((nsol,NX))
+    F = np.zeros((nsol,NX))
+    RHS = np.zeros((nsol,NX))
+    for ic in range(X_controls.shape[1]):
+        F[:,1:-1]+=X_controls[:,ic:ic+1]*np.exp(-100*(x[1:-1]-L/(ic+1))**2)
+
+    dt = 0.5*dx**2/(V*dx+2*K+np.abs(np.max(F,axis=1,keepdims=True))*dx**2)
+
+    #chaque ligne s'arrete quand son residu relatif passe sous eps
+    n=0
+    res=np.ones(nsol)
+    res0=np.ones(nsol)
+    active=np.ones(nsol,dtype=bool)
+    while(n<NT and active.any()):
+        n+=1
+        RHS,resn=adrs_residual(T,F,dx,dt,V,xnu,lamda,RHS)
+        RHS[~active]=0
+        T[:,1:-1]+=RHS[:,1:-1]
+        res=np.where(active,resn,res)
+        if (n == 1 ):
+            res0=res.copy()
+        active=res>eps*res0
+
+    costs=np.sum((T-Target)**2,axis=1)*dx #Riemann integral of J
+
+    return costs,T
+
+def ADRS_adjoint(NX,xcontrol,Target):
+    """
+    Etat stationnaire discret de ADRS (meme schema centre + viscosite
+    numerique, T=0 aux bords) resolu directement, et gradient du cout
+    J = dx*|T-Target|^2 par rapport aux controles via l'etat adjoint :
+        M T = -F ,  M^T P = 2 dx (T-Target) ,  dJ/dx_ic = -<P, g_ic>
+    Deux resolutions tridiagonales quel que soit le nombre de controles.
+    Retourne (cost, grad, T).
+    """
+    # PHYSICAL PARAMETERS (memes que ADRS)
+    K = 0.1     #Diffusion coefficient
+    L = 1.0     #Domain size
+    V=1
+    lamda=1
+
+    dx = L/(NX-1)
+    x = np.linspace(0.0,1.0,NX)
+    xnu=K+0.5*dx*abs(V)
+
+    #sources elementaires g_ic aux noeuds interieurs
+    G=np.zeros((len(xcontrol),NX-2))
+    for ic in range(len(xcontrol)):
+        G[ic]=np.exp(-100*(x[1:-1]-L/(ic+1))**2)
+    F=xcontrol@G
+
+    #operateur -V Tx + xnu Txx - lamda T sur les noeuds interieurs (stockage bande)
+    low=V/(2*dx)+xnu/dx**2     #coefficient de T[j-1]
+    up=-V/(2*dx)+xnu/dx**2     #coefficient de T[j+1]
+    M=np.zeros((3,NX-2))
+    M[0,1:]=up
+    M[1,:]=-2*xnu/dx**2-lamda
+    M[2,:-1]=low
+    MT=np.zeros((3,NX-2))
+    MT[0,1:]=low
+    MT[1,:]=M[1,:]
+    MT[2,:-1]=up
+
+    T=np.zeros((NX))
+    T[1:-1]=solve_banded((1,1),M,-F)
+    cost=np.dot(T-Target,T-Target)*dx
+
+    P=solve_banded((1,1),MT,2*dx*(T[1:-1]-Target[1:-1]))
+    grad=-G@P
+
+    return cost,grad,T
+
 #%%
 
+#base de sensibilite : u(x) = T0 + sum_i x_i T_i (linearite en controles)
+_basis_cache={}
+
+class SensitivityBasis:
+    """
+    Solutions elementaires T0 (controle nul) et T_i (controle e_i) sur un
+    maillage a NX points, calculees une seule fois (un appel a ADRS_batch).
+    A = <T_i,T_j> est assemblee par un produit matriciel et factorisee
+    (Cholesky) une fois ; B et x* se calculent ensuite pour toute cible.
+    """
+    def __init__(self,NX,nbc):
+        self.NX=NX
+        self.nbc=nbc
+        #controle nul puis e_1..e_nbc, resolus en un seul appel batch
+        X=np.vstack((np.zeros(nbc),np.eye(nbc)))
+        cost,Tall=ADRS_batch(NX,X,np.zeros(NX))
+        self.T0=Tall[0]
+        self.Tb=Tall[1:]
+        self.A=self.Tb@self.Tb.T/(NX-1)
+        self.A_factor=cho_factor(self.A)
+
+    def rhs(self,Target):
+        #B_i = <Target-T0, T_i>
+        return self.Tb@(Target-self.T0)/(self.NX-1)
+
+    def solve(self,Target):
+        #xopt : A xopt = B (factorisation reutilisee)
+        return cho_solve(self.A_factor,self.rhs(Target))
+
+    def reconstruct(self,xcontrol):
+        return self.T0+xcontrol@self.Tb
+
+def sensitivity_basis(NX,nbc):
+    #une base par cle (NX, forme des controles) ; les cibles suivantes la reutilisent
+    key=(NX,nbc)
+    if key not in _basis_cache:
+        _basis_cache[key]=SensitivityBasis(NX,nbc)
+    return _basis_cache[key]
+
 nbc=6
 NX=30
 nb_iter_refine=1
@@ -113,34 +245,14 @@ for irefine in range(nb_iter_refine):
     # for i in range(NX):
     #     Target[i]=np.sin(2*np.pi*(i+1)/NX)
         
-    xcontrol=np.zeros(nbc)
-    cost,T0=ADRS(NX,xcontrol,Target)
-    
-    # plt.plot(T0)
-    # plt.show()
-    
-    A=np.zeros((nbc,nbc))
-    B=np.zeros(nbc)
-    
-    for ic in range(nbc):
-        xic=np.zeros(nbc)
-        xic[ic]=1
-        cost,Tic=ADRS(NX,xic,Target)
-        B[ic]=np.dot((Target-T0),Tic)/(NX-1)
-        for jc in range(0,ic+1):
-            xjc=np.zeros(nbc)
-            xjc[jc]=1
-            cost,Tjc=ADRS(NX,xjc,Target)
-            A[ic,jc]=np.dot(Tic,Tjc)/(NX-1)
-
-    for ic in range(nbc):            
-        for jc in range(ic,nbc):
-            A[ic,jc]=A[jc,ic]            
+    basis=sensitivity_basis(NX,nbc)
+    A=basis.A
+    B=basis.rhs(Target)
             
     # print("A=",A)
     # print("B=",B)
     
-    xopt=np.linalg.solve(A, B)
+    xopt=basis.solve(Target)
     print("Xopt=",xopt)        
     cost_opt,T=ADRS(NX,xopt,Target)
     print("cost_opt=",cost_opt)
@@ -173,21 +285,42 @@ plt.show()
 
 #Using python optimizer
 
+#cible construite une seule fois, hors de la fonctionnelle
+NX_fun=28
+xcible=np.arange(nbc)+1
+cost_junk,grad_junk,Target_fun=ADRS_adjoint(NX_fun,xcible,np.zeros(NX_fun))
+# for i in range(NX_fun):
+#     Target_fun[i]=np.sin(2*np.pi*(i+1)/NX_fun)
+
 def functional(x):
-    NX=28
-    Target=np.zeros(NX)
-    # for i in range(NX):
-    #     Target[i]=np.sin(2*np.pi*(i+1)/NX)
-    nbc=6
-    xcible=np.arange(nbc)+1
-    cost,Target=ADRS(NX,xcible,Target)
-    cost,T=ADRS(NX,x,Target)
-    return cost
+    #cout et gradient adjoint ensemble (jac=True) : 2 solves par evaluation
+    cost,grad,T=ADRS_adjoint(NX_fun,x,Target_fun)
+    return cost,grad
 
 #use python minimizer 
 x0=np.zeros((nbc))
 options = { "maxiter": 100, 'disp': True}
-res = minimize(functional, x0, options=options)
+res = minimize(functional, x0, jac=True, options=options)
 print("------------------------------------------------")
 print(res)
 print("------------------------------------------------")
+
+#%%
+
+#carte J(x1,x2), autres controles figes a l'optimum lineaire : une seule resolution batch
+n_grid=25
+x1=np.linspace(x_best[0]-1,x_best[0]+1,n_grid)
+x2=np.linspace(x_best[1]-1,x_best[1]+1,n_grid)
+X1,X2=np.meshgrid(x1,x2,indexing="ij")
+X_controls=np.tile(x_best,(n_grid*n_grid,1))
+X_controls[:,0]=X1.ravel()
+X_controls[:,1]=X2.ravel()
+costs,T_all=ADRS_batch(len(Target_opt),X_controls,Target_opt)
+
+plt.contourf(X1,X2,np.log10(costs.reshape(n_grid,n_grid)),30)
+plt.colorbar(label="Log10(Cost)")
+plt.plot(x_best[0],x_best[1],'r*',markersize=12,label="Optim Linear")
+plt.xlabel("x1")
+plt.ylabel("x2")
+plt.legend()
+plt.show()